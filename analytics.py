@@ -0,0 +1,135 @@
+from collections import Counter
+import numpy as np
+from sqlalchemy import select, func
+from models import db, TeamMember, Rating, RatingArchive, RATING_CRITERIA
+from archive import archived_until
+
+DEFAULT_TREND_WINDOW = 10
+MAX_TREND_WINDOW = 100
+
+def _rating_columns(model):
+    return [model.team_member_id, model.timestamp, model.id, model.total_score] + [
+        getattr(model, name) for name in RATING_CRITERIA
+    ]
+
+def _archived_rows(member_ids, window):
+    # Only each member's latest `window` archived ratings are needed, however long their history
+    recency = func.row_number().over(
+        partition_by=RatingArchive.team_member_id,
+        order_by=(RatingArchive.timestamp.desc(), RatingArchive.id.desc())
+    ).label('recency')
+    recent = select(*_rating_columns(RatingArchive), recency).where(
+        RatingArchive.team_member_id.in_(member_ids)
+    ).subquery()
+    return db.session.execute(
+        select(*[column for column in recent.c if column.name != 'recency']).where(recent.c.recency <= window)
+    ).all()
+
+def load_team_ratings(team_id, window):
+    # One query for the whole team, straight into arrays
+    rows = db.session.execute(
+        select(*_rating_columns(Rating))
+        .join(TeamMember, Rating.team_member_id == TeamMember.id)
+        .where(TeamMember.team_id == team_id)
+    ).all()
+    rating_counts = Counter(row[0] for row in rows)
+
+    # Members with fewer hot ratings than the window are topped up from the archive
+    if archived_until() is not None:
+        archived_counts = dict(db.session.execute(
+            select(RatingArchive.team_member_id, func.count(RatingArchive.id))
+            .join(TeamMember, RatingArchive.team_member_id == TeamMember.id)
+            .where(TeamMember.team_id == team_id).group_by(RatingArchive.team_member_id)
+        ).all())
+        short = [member_id for member_id in archived_counts if rating_counts[member_id] < window]
+        if short:
+            rows += _archived_rows(short, window)
+        rating_counts.update(archived_counts)
+
+    if not rows:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.empty((0, len(RATING_CRITERIA)), dtype=np.int64), rating_counts
+    columns = list(zip(*rows))
+    member_ids = np.asarray(columns[0], dtype=np.int64)
+    timestamps = np.asarray(columns[1], dtype='datetime64[us]')
+    rating_ids = np.asarray(columns[2], dtype=np.int64)
+    totals = np.asarray(columns[3], dtype=np.float64)
+    criteria = np.column_stack([np.asarray(column, dtype=np.float64) for column in columns[4:]])
+
+    # Group by member, oldest first within each member
+    order = np.lexsort((rating_ids, timestamps, member_ids))
+    return member_ids[order], totals[order], criteria[order], rating_counts
+
+def _groups(member_ids):
+    starts = np.flatnonzero(np.r_[True, member_ids[1:] != member_ids[:-1]])
+    counts = np.diff(np.r_[starts, member_ids.size])
+    return starts, counts
+
+def percentile_ranks(values):
+    # Share of members scoring below, counting ties as half
+    ordered = np.sort(values)
+    below = np.searchsorted(ordered, values, side='left')
+    at_or_below = np.searchsorted(ordered, values, side='right')
+    return (below + (at_or_below - below) / 2) / values.size * 100
+
+def compute_analytics(member_ids, totals, criteria, window):
+    starts, counts = _groups(member_ids)
+    # Position of each rating within its member; keep only each member's last `window` ratings
+    position = np.arange(member_ids.size) - np.repeat(starts, counts)
+    keep = position >= np.repeat(counts - window, counts)
+    member_ids, totals, criteria = member_ids[keep], totals[keep], criteria[keep]
+    x = (position - np.repeat(np.maximum(counts - window, 0), counts))[keep].astype(np.float64)
+
+    starts, counts = _groups(member_ids)
+    n = counts.astype(np.float64)
+    mean_totals = np.add.reduceat(totals, starts) / n
+    mean_criteria = np.add.reduceat(criteria, starts, axis=0) / n[:, None]
+
+    # Least-squares slope of total score against rating number, per member
+    sum_x = np.add.reduceat(x, starts)
+    sum_y = np.add.reduceat(totals, starts)
+    sum_xy = np.add.reduceat(x * totals, starts)
+    sum_xx = np.add.reduceat(x * x, starts)
+    denominator = n * sum_xx - sum_x ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slopes = np.where(denominator > 0, (n * sum_xy - sum_x * sum_y) / denominator, np.nan)
+
+    return {
+        'member_ids': member_ids[starts],
+        'window_count': counts,
+        'avg_total_score': mean_totals,
+        'percentile_rank': percentile_ranks(mean_totals),
+        'trend_slope': slopes,
+        'weakest_criterion': np.argmin(mean_criteria, axis=1),
+        'criteria': mean_criteria
+    }
+
+def team_analytics(team_id, window=DEFAULT_TREND_WINDOW):
+    from payloads import MemberAnalyticsPayload
+
+    members = db.session.execute(
+        select(TeamMember.id, TeamMember.first_name, TeamMember.surname, TeamMember.employer_id)
+        .where(TeamMember.team_id == team_id).order_by(TeamMember.id)
+    ).all()
+    member_ids, totals, criteria, rating_counts = load_team_ratings(team_id, window)
+
+    results = {}
+    if member_ids.size:
+        stats = compute_analytics(member_ids, totals, criteria, window)
+        slopes = stats['trend_slope']
+        for index, member_id in enumerate(stats['member_ids'].tolist()):
+            results[member_id] = {
+                'rating_count': rating_counts[member_id],
+                'window_count': int(stats['window_count'][index]),
+                'avg_total_score': round(float(stats['avg_total_score'][index]), 2),
+                'percentile_rank': round(float(stats['percentile_rank'][index]), 1),
+                'trend_slope': None if np.isnan(slopes[index]) else round(float(slopes[index]), 3),
+                'weakest_criterion': RATING_CRITERIA[stats['weakest_criterion'][index]],
+                'criteria': dict(zip(RATING_CRITERIA, np.round(stats['criteria'][index], 2).tolist()))
+            }
+
+    # Members without ratings are listed with empty statistics
+    return [
+        MemberAnalyticsPayload(member_id, first_name, surname, employer_id, **results.get(member_id, {}))
+        for member_id, first_name, surname, employer_id in members
+    ]
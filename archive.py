@@ -0,0 +1,46 @@
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import select, insert, delete, func
+from models import db, Rating, RatingArchive, TeamMember, RATING_CRITERIA
+from rollups import rollup_gaps, rebuild_rollups
+
+RATING_COLUMNS = ('id', 'team_member_id', 'timestamp') + RATING_CRITERIA + ('total_score', 'avg_score')
+
+def archived_until():
+    # Every archived rating is older than every rating still in the hot table
+    return db.session.execute(select(func.max(RatingArchive.timestamp))).scalar()
+
+def reaches_archive(start):
+    watermark = archived_until()
+    return watermark is not None and (start is None or start <= watermark)
+
+def archive_ratings(horizon_days, batch_size=5000):
+    cutoff = datetime.utcnow() - timedelta(days=horizon_days)
+    # Ratings must be folded into the per-period summaries before they leave the hot table.
+    # New ratings are rolled up as they are saved; older ones only by a rebuild, so teams
+    # whose rollups miss ratings are rebuilt first (rebuild_rollups reads both tables).
+    team_ids = db.session.execute(
+        select(TeamMember.team_id).join(Rating, Rating.team_member_id == TeamMember.id)
+        .where(Rating.timestamp < cutoff).distinct()
+    ).scalars().all()
+    gaps = rollup_gaps(team_ids)
+    if gaps:
+        logging.info(f"Rebuilding rollups for {len(gaps)} teams before archiving")
+        rebuild_rollups(team_ids=gaps)
+    columns = [getattr(Rating, name) for name in RATING_COLUMNS]
+    moved = 0
+    while True:
+        ids = db.session.execute(
+            select(Rating.id).where(Rating.timestamp < cutoff).order_by(Rating.id).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            break
+        db.session.execute(
+            insert(RatingArchive).from_select(RATING_COLUMNS, select(*columns).where(Rating.id.in_(ids)))
+        )
+        db.session.execute(delete(Rating).where(Rating.id.in_(ids)))
+        # Each batch commits on its own so the hot table is never locked for long
+        db.session.commit()
+        moved += len(ids)
+    logging.info(f"Archived {moved} ratings older than {cutoff:%Y-%m-%d}")
+    return moved
@@ -0,0 +1,51 @@
+import json
+import os
+import re
+from flask import url_for
+
+# Matches the names written by build_static.py
+HASHED_RE = re.compile(r'\.[0-9a-f]{12}\.')
+
+def load_manifest(static_folder):
+    try:
+        with open(os.path.join(static_folder, 'staticfiles.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        # No build step has run (local development): serve the original names
+        return {'paths': {}, 'webp': {}}
+
+def init_assets(app):
+    from whitenoise import WhiteNoise
+
+    manifest = load_manifest(app.static_folder)
+    paths = manifest.get('paths', {})
+    webp = manifest.get('webp', {})
+
+    # WhiteNoise answers static requests before Flask sees them. Hashed names never change
+    # content, so they are served with a far-future immutable Cache-Control.
+    app.wsgi_app = WhiteNoise(
+        app.wsgi_app,
+        root=app.static_folder,
+        prefix=app.static_url_path.strip('/') + '/',
+        max_age=app.config['STATIC_MAX_AGE'],
+        autorefresh=app.debug,
+        # Must be given here: without autorefresh, headers are computed while the files are scanned in __init__
+        immutable_file_test=lambda path, url: bool(HASHED_RE.search(url))
+    )
+
+    # Existing url_for('static', filename=...) calls pick up the hashed name automatically
+    @app.url_defaults
+    def hashed_static_url(endpoint, values):
+        if endpoint == 'static' and 'filename' in values:
+            values['filename'] = paths.get(values['filename'], values['filename'])
+
+    def asset_url(filename):
+        return url_for('static', filename=filename)
+
+    def webp_srcset(filename):
+        variants = webp.get(filename, {})
+        return ', '.join(f"{url_for('static', filename=name)} {width}w" for width, name in sorted(
+            variants.items(), key=lambda item: int(item[0])
+        ))
+
+    app.jinja_env.globals.update(asset_url=asset_url, webp_srcset=webp_srcset)
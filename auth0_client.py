@@ -0,0 +1,156 @@
+import os
+import threading
+import time
+import logging
+import requests
+from cachetools import LRUCache
+from flask import has_app_context
+
+# Refresh the management token this many seconds before Auth0 expires it
+TOKEN_EXPIRY_MARGIN = 60
+MAX_RETRIES = 3
+
+class Auth0Error(Exception):
+    pass
+
+class RateLimiter:
+    # Spaces requests out evenly across all threads sharing the client
+    def __init__(self, per_second):
+        self.interval = 1.0 / per_second if per_second > 0 else 0
+        self.lock = threading.Lock()
+        self.next_slot = time.monotonic()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def pause_until(self, timestamp):
+        with self.lock:
+            self.next_slot = max(self.next_slot, timestamp)
+
+class Auth0Client:
+    def __init__(self, domain, client_id=None, client_secret=None, static_token=None, base_url=None,
+                 pool_size=10, requests_per_second=10, user_cache_size=4096):
+        self.domain = domain
+        self.base_url = (base_url or f'https://{domain}').rstrip('/')
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.static_token = static_token
+        self.limiter = RateLimiter(requests_per_second)
+
+        self.http = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.http.mount('https://', adapter)
+        self.http.mount('http://', adapter)
+
+        self._token = None
+        self._token_expires_at = 0
+        self._token_lock = threading.Lock()
+        self._user_ids = LRUCache(maxsize=user_cache_size)
+        self._user_ids_lock = threading.Lock()
+
+    def get_token(self):
+        if not (self.client_id and self.client_secret):
+            if not self.static_token:
+                raise Auth0Error('No Auth0 management credentials configured')
+            return self.static_token
+        with self._token_lock:
+            if self._token and time.time() < self._token_expires_at - TOKEN_EXPIRY_MARGIN:
+                return self._token
+            response = self.http.post(f'{self.base_url}/oauth/token', timeout=10, json={
+                'client_id': self.client_id,
+                'client_secret': self.client_secret,
+                'audience': f'https://{self.domain}/api/v2/',
+                'grant_type': 'client_credentials'
+            })
+            response.raise_for_status()
+            data = response.json()
+            self._token = data['access_token']
+            self._token_expires_at = time.time() + data.get('expires_in', 86400)
+            return self._token
+
+    def invalidate_token(self):
+        with self._token_lock:
+            self._token = None
+
+    def request(self, method, path, **kwargs):
+        refreshed = False
+        for attempt in range(MAX_RETRIES + 1):
+            self.limiter.wait()
+            headers = {'Authorization': f'Bearer {self.get_token()}', 'Content-Type': 'application/json'}
+            response = self.http.request(method, f'{self.base_url}{path}', headers=headers, timeout=10, **kwargs)
+            if response.status_code == 401 and not refreshed:
+                refreshed = True
+                self.invalidate_token()
+                continue
+            if response.status_code != 429 or attempt == MAX_RETRIES:
+                return response
+            # Auth0 reports when the rate limit window resets; hold every thread until then
+            reset = response.headers.get('X-RateLimit-Reset')
+            delay = max(float(reset) - time.time(), 0) if reset else 2 ** attempt
+            self.limiter.pause_until(time.monotonic() + delay)
+        return response
+
+    def resolve_user_id(self, email, auth0_id=None, lookup_db=True):
+        if auth0_id:
+            return auth0_id
+        if lookup_db and has_app_context():
+            from models import User
+            user = User.query.filter_by(email=email).first()
+            if user is not None and user.auth0_id:
+                return user.auth0_id
+        with self._user_ids_lock:
+            user_id = self._user_ids.get(email)
+        if user_id:
+            return user_id
+
+        response = self.request('GET', '/api/v2/users-by-email', params={'email': email})
+        if response.status_code != 200 or not response.json():
+            logging.warning(f"Auth0 user lookup failed for {email}: {response.status_code}")
+            return None
+        user_id = response.json()[0]['user_id']
+        with self._user_ids_lock:
+            self._user_ids[email] = user_id
+        return user_id
+
+    def update_user(self, user_id, data):
+        response = self.request('PATCH', f'/api/v2/users/{user_id}', json=data)
+        if response.status_code != 200:
+            logging.warning(f"Auth0 update failed for {user_id}: {response.status_code}")
+            return False
+        return True
+
+    def set_blocked(self, user_id, blocked):
+        return self.update_user(user_id, {'blocked': blocked})
+
+    def update_user_metadata(self, user_id, metadata):
+        return self.update_user(user_id, {'user_metadata': metadata})
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_auth0_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            static_token = os.getenv('AUTH0_API_TOKEN')
+            client_id = os.getenv('AUTH0_MANAGEMENT_CLIENT_ID')
+            client_secret = os.getenv('AUTH0_MANAGEMENT_CLIENT_SECRET')
+            if not client_id and not static_token:
+                client_id = os.getenv('AUTH0_CLIENT_ID')
+                client_secret = os.getenv('AUTH0_CLIENT_SECRET')
+            _client = Auth0Client(
+                os.getenv('AUTH0_DOMAIN'),
+                client_id=client_id,
+                client_secret=client_secret,
+                static_token=static_token,
+                # Lets tests and the scheduler run against a local stand-in of the Management API
+                base_url=os.getenv('AUTH0_API_BASE_URL'),
+                pool_size=int(os.getenv('AUTH0_SYNC_WORKERS', 8)),
+                requests_per_second=float(os.getenv('AUTH0_REQUESTS_PER_SECOND', 10))
+            )
+        return _client
@@ -1,5 +1,6 @@
 from functools import wraps
 from flask import session, redirect, url_for
+from models import User
 
 def login_required(f):
     @wraps(f)
@@ -7,4 +8,20 @@ def login_required(f):
         if 'user' not in session:
             return redirect(url_for('login'))
         return f(*args, **kwargs)
-    return decorated_function
\ No newline at end of file
+    return decorated_function
+
+def get_current_user():
+    user_info = session.get('user')
+    if not user_info or not user_info.get('email'):
+        return None
+    return User.query.filter_by(email=user_info['email']).first()
+
+def get_current_client_id():
+    # Kept in the session so cached endpoints can be answered without a User query
+    client_id = session.get('client_id')
+    if client_id is None:
+        user = get_current_user()
+        if user is None:
+            return None
+        client_id = session['client_id'] = user.client_id
+    return client_id
\ No newline at end of file
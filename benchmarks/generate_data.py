@@ -0,0 +1,149 @@
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import insert, text
+
+# Fills the schema with synthetic clients, teams and ratings for benchmarking.
+# Run from the repository root:
+#   python -m benchmarks.generate_data --database-url sqlite:///bench.db --ratings-per-member 50
+
+CRITERIA_RANGE = (1, 10)
+BATCH_SIZE = 10000
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Generate synthetic Rater data')
+    parser.add_argument('--database-url', default='sqlite:///bench.db')
+    parser.add_argument('--clients', type=int, default=10)
+    parser.add_argument('--users-per-client', type=int, default=5)
+    parser.add_argument('--teams-per-client', type=int, default=10)
+    parser.add_argument('--members-per-team', type=int, default=20)
+    parser.add_argument('--ratings-per-member', type=int, default=52)
+    parser.add_argument('--rating-interval-days', type=int, default=7)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--rollups', action='store_true', help='Rebuild rating rollups after loading')
+    return parser.parse_args()
+
+def insert_batches(db, model, rows):
+    batch = []
+    count = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            db.session.execute(insert(model), batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        db.session.execute(insert(model), batch)
+        count += len(batch)
+    db.session.commit()
+    return count
+
+def reset_sequences(db):
+    # Ids are assigned explicitly above, so Postgres sequences have to be moved past them
+    if db.engine.dialect.name != 'postgresql':
+        return
+    for table in ('client', 'settings', 'user', 'team', 'team_member', 'rating'):
+        db.session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), COALESCE(MAX(id), 1)) FROM \"{table}\""
+        ))
+    db.session.commit()
+
+def generate(args):
+    from models import db, Client, User, Team, TeamMember, Rating, Settings, RATING_CRITERIA
+
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+
+    db.drop_all()
+    db.create_all()
+
+    clients = [
+        {'id': c, 'name': f'Client {c}', 'email': f'client{c}@example.com', 'tier': c % 4, 'payment_status': 'active'}
+        for c in range(1, args.clients + 1)
+    ]
+    insert_batches(db, Client, clients)
+    insert_batches(db, Settings, ({'id': c['id'], 'client_id': c['id']} for c in clients))
+
+    users = []
+    for client in clients:
+        for u in range(args.users_per_client):
+            users.append({
+                'id': len(users) + 1,
+                'username': f'user{client["id"]}_{u}',
+                'email': f'user{client["id"]}_{u}@example.com',
+                'is_admin': u == 0,
+                'client_id': client['id']
+            })
+    insert_batches(db, User, users)
+
+    teams = []
+    for client in clients:
+        client_users = [user['id'] for user in users if user['client_id'] == client['id']]
+        for t in range(args.teams_per_client):
+            teams.append({
+                'id': len(teams) + 1,
+                'name': f'Team {t}',
+                'client_id': client['id'],
+                'user_id': client_users[t % len(client_users)] if client_users else None
+            })
+    insert_batches(db, Team, teams)
+
+    members = []
+    for team in teams:
+        for m in range(args.members_per_team):
+            members.append({
+                'id': len(members) + 1,
+                'first_name': f'First{m}',
+                'surname': f'Surname{team["id"]}',
+                'employer_id': f'E{team["id"]:05d}{m:04d}',
+                'team_id': team['id']
+            })
+    insert_batches(db, TeamMember, members)
+
+    def ratings():
+        rating_id = 0
+        for member in members:
+            for r in range(args.ratings_per_member):
+                rating_id += 1
+                values = {name: rng.randint(*CRITERIA_RANGE) for name in RATING_CRITERIA}
+                total = sum(values.values())
+                values.update({
+                    'id': rating_id,
+                    'team_member_id': member['id'],
+                    'timestamp': now - timedelta(days=r * args.rating_interval_days, minutes=rng.randint(0, 1440)),
+                    'total_score': total,
+                    'avg_score': total / len(RATING_CRITERIA)
+                })
+                yield values
+
+    started = time.perf_counter()
+    rating_count = insert_batches(db, Rating, ratings())
+    print(f'Inserted {rating_count} ratings in {time.perf_counter() - started:.1f}s')
+
+    reset_sequences(db)
+
+    if args.rollups:
+        from rollups import rebuild_rollups
+        rebuild_rollups()
+
+    return {
+        'clients': len(clients),
+        'users': len(users),
+        'teams': len(teams),
+        'team_members': len(members),
+        'ratings': rating_count
+    }
+
+def main():
+    args = parse_args()
+    # Config reads DATABASE_URL when it is imported
+    os.environ['DATABASE_URL'] = args.database_url
+    from webhook import create_app
+    app = create_app()
+    with app.app_context():
+        print(generate(args))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+import os
+from flask import Flask, session
+from config import Config
+from models import db
+from db_routing import init_read_replica
+from rollups import init_rollups
+from notifications import init_notifications
+from instrumentation import init_instrumentation
+from response_cache import init_response_cache
+
+# A cut-down create_app for load tests: the same config, pools, replica routing and hot
+# read endpoints as wsgi:app, without Auth0 or the page routes. Every request is logged in
+# as LOAD_TEST_USER_EMAIL, so no browser session cookie is needed.
+#   python -m benchmarks.load_benchmark --app benchmarks.load_app:app --path /rate_team/get_team_history/1
+
+def create_load_app():
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.secret_key = app.config['SECRET_KEY'] or 'load-test'
+
+    db.init_app(app)
+    init_read_replica(app, db)
+    init_rollups()
+    init_notifications()
+    init_instrumentation(app)
+
+    from routes.team_history import team_history_bp
+    from routes.team_analytics import team_analytics_bp
+    from routes.export import export_bp
+    app.register_blueprint(team_history_bp, url_prefix='/rate_team')
+    app.register_blueprint(team_analytics_bp, url_prefix='/rate_team')
+    app.register_blueprint(export_bp, url_prefix='/export')
+    init_response_cache(app)
+
+    email = os.environ['LOAD_TEST_USER_EMAIL']
+
+    @app.before_request
+    def log_in():
+        session['user'] = {'email': email}
+
+    @app.route('/')
+    def index():
+        return 'ok'
+
+    return app
+
+app = create_load_app()
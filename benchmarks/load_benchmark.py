@@ -0,0 +1,154 @@
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+import requests
+
+# Starts gunicorn with an increasing number of workers and measures throughput and latency
+# against a fixed set of paths. Throughput should grow roughly linearly with workers until
+# the machine's cores or the database become the bottleneck. --baseline also measures the
+# single-process Werkzeug server the Procfile ran before gunicorn.
+#
+#   python -m benchmarks.generate_data --database-url sqlite:///bench.db
+#   DATABASE_URL=sqlite:///bench.db python -m benchmarks.load_benchmark --baseline --workers 1 2 4 --threads 4
+#
+# Authenticated endpoints need a session cookie from a logged-in browser and a
+# shared session backend (SESSION_TYPE=redis or sqlalchemy):
+#   python -m benchmarks.load_benchmark --cookie "session=..." --path /rate_team/get_team_history/1
+# or benchmarks.load_app, which logs every request in as LOAD_TEST_USER_EMAIL:
+#   LOAD_TEST_USER_EMAIL=user1_0@example.com python -m benchmarks.load_benchmark \
+#       --app benchmarks.load_app:app --path /rate_team/get_team_history/1
+#
+# Each run is appended to benchmarks/load_test_results.jsonl together with the revision and the
+# machine's core count; commit that file so scaling can be compared between changes.
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Load test gunicorn worker scaling')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--clients', type=int, default=32, help='Concurrent client threads')
+    parser.add_argument('--duration', type=float, default=20.0, help='Seconds per worker count')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--app', default='wsgi:app', help='WSGI application to serve')
+    parser.add_argument('--baseline', action='store_true', help='Also measure the Werkzeug development server')
+    parser.add_argument('--path', action='append', default=None)
+    parser.add_argument('--cookie', default=None)
+    parser.add_argument('--output', default=os.path.join(os.path.dirname(__file__), 'load_test_results.jsonl'))
+    parser.add_argument('--label', default=None, help='Free-form note stored with the run')
+    return parser.parse_args()
+
+def start_server(server, app, workers, threads, port):
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), WEB_THREADS=str(threads), PORT=str(port), FAST_START='true')
+    if server == 'gunicorn':
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', app]
+    else:
+        # What `python app.py` served before: one process, a thread per request
+        command = [sys.executable, '-m', 'flask', '--app', app, 'run', '--port', str(port), '--with-threads']
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}/'
+    for _ in range(100):
+        try:
+            requests.get(url, timeout=1)
+            return process
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError('gunicorn did not start')
+
+def run_clients(base_url, paths, clients, duration, cookie):
+    deadline = time.monotonic() + duration
+    counts = {'ok': 0, 'error': 0}
+    latencies = []
+    lock = threading.Lock()
+
+    def client(index):
+        ok = error = 0
+        timings = []
+        with requests.Session() as http:
+            if cookie:
+                http.headers['Cookie'] = cookie
+            while time.monotonic() < deadline:
+                path = paths[(ok + error + index) % len(paths)]
+                started = time.perf_counter()
+                try:
+                    response = http.get(base_url + path, timeout=10)
+                    if response.status_code < 500:
+                        ok += 1
+                        timings.append((time.perf_counter() - started) * 1000)
+                    else:
+                        error += 1
+                except requests.RequestException:
+                    error += 1
+        with lock:
+            counts['ok'] += ok
+            counts['error'] += error
+            latencies.extend(timings)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts, sorted(latencies)
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return None
+    return round(ordered[min(int(len(ordered) * fraction), len(ordered) - 1)], 1)
+
+def main():
+    args = parse_args()
+    paths = args.path or ['/']
+    servers = [('werkzeug', 1)] if args.baseline else []
+    servers += [('gunicorn', workers) for workers in args.workers]
+    baseline = None
+    rows = []
+    print(f"{'server':>9} {'workers':>8} {'threads':>8} {'req/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'errors':>8} {'vs first':>8}")
+    for server, workers in servers:
+        process = start_server(server, args.app, workers, args.threads, args.port)
+        try:
+            counts, latencies = run_clients(f'http://127.0.0.1:{args.port}', paths, args.clients, args.duration,
+                                            args.cookie)
+        finally:
+            process.send_signal(signal.SIGTERM)
+            process.wait()
+        throughput = counts['ok'] / args.duration
+        baseline = baseline or throughput
+        row = {
+            'server': server,
+            'workers': workers,
+            'threads': args.threads if server == 'gunicorn' else None,
+            'throughput_rps': round(throughput, 1),
+            'p50_ms': percentile(latencies, 0.5),
+            'p99_ms': percentile(latencies, 0.99),
+            'errors': counts['error'],
+            'scaling': round(throughput / baseline, 2)
+        }
+        rows.append(row)
+        print(f"{server:>9} {workers:>8} {row['threads'] or '-':>8} {throughput:>10.1f} {row['p50_ms']:>8} "
+              f"{row['p99_ms']:>8} {counts['error']:>8} {row['scaling']:>7.2f}x")
+
+    from benchmarks.run_benchmarks import git_revision
+    run = {
+        'timestamp': datetime.utcnow().isoformat(),
+        'revision': git_revision(),
+        'label': args.label,
+        'cpu_count': os.cpu_count(),
+        'app': args.app,
+        'database': os.getenv('DATABASE_URL', 'sqlite:///site.db').split(':', 1)[0],
+        'clients': args.clients,
+        'duration': args.duration,
+        'paths': paths,
+        'results': rows
+    }
+    with open(args.output, 'a') as f:
+        f.write(json.dumps(run) + '\n')
+    print(f'Results appended to {args.output}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+import argparse
+import json
+import os
+import subprocess
+import time
+from datetime import datetime
+import numpy as np
+
+# Drives the Flask test client against the hot endpoints and appends the results
+# to a JSON lines file so runs can be compared over time. Generate data first:
+#   python -m benchmarks.generate_data --database-url sqlite:///bench.db
+#   python -m benchmarks.run_benchmarks --database-url sqlite:///bench.db
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark Rater endpoints')
+    parser.add_argument('--database-url', default='sqlite:///bench.db')
+    parser.add_argument('--client-id', type=int, default=1)
+    parser.add_argument('--requests', type=int, default=200, help='Timed requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--output', default=os.path.join(os.path.dirname(__file__), 'results.jsonl'))
+    parser.add_argument('--label', default=None, help='Free-form note stored with the run')
+    return parser.parse_args()
+
+def benchmark_targets(client_id):
+    from models import User, Team, TeamMember
+    user = User.query.filter_by(client_id=client_id, is_admin=True).first()
+    team = Team.query.filter_by(client_id=client_id).first()
+    member = TeamMember.query.filter_by(team_id=team.id).first()
+    targets = {
+        'get_teams': '/team_management/get_teams',
+        'get_team_members': f'/rate_team/get_team_members/{team.id}',
+        'get_historical_data': f'/rate_team/get_historical_data/{member.id}',
+        'get_team_history': f'/rate_team/get_team_history/{team.id}',
+        'get_team_history_columnar': f'/rate_team/get_team_history/{team.id}?format=columnar',
+        'get_team_analytics': f'/rate_team/get_team_analytics/{team.id}',
+        'get_settings': '/setup/get_settings',
+        'dashboard': '/dashboard/',
+    }
+    return user, targets
+
+def run_endpoint(test_client, url, requests, warmup):
+    from instrumentation import metrics
+
+    for _ in range(warmup):
+        test_client.get(url)
+    metrics.reset()
+
+    latencies = []
+    statuses = set()
+    started = time.perf_counter()
+    for _ in range(requests):
+        request_started = time.perf_counter()
+        response = test_client.get(url)
+        latencies.append((time.perf_counter() - request_started) * 1000)
+        statuses.add(response.status_code)
+    elapsed = time.perf_counter() - started
+
+    endpoints = metrics.snapshot()
+    query_count = sum(m['query_count']['sum'] for m in endpoints.values())
+    sql_ms = sum(m['sql_ms']['sum'] for m in endpoints.values())
+    return {
+        'url': url,
+        'statuses': sorted(statuses),
+        'requests': requests,
+        'throughput_rps': round(requests / elapsed, 1),
+        'p50_ms': round(float(np.percentile(latencies, 50)), 2),
+        'p99_ms': round(float(np.percentile(latencies, 99)), 2),
+        'queries_per_request': round(query_count / requests, 2),
+        'sql_ms_per_request': round(sql_ms / requests, 2),
+    }
+
+def dataset_size():
+    from models import Client, Team, TeamMember, Rating
+    return {
+        'clients': Client.query.count(),
+        'teams': Team.query.count(),
+        'team_members': TeamMember.query.count(),
+        'ratings': Rating.query.count(),
+    }
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+def main():
+    args = parse_args()
+    # Config reads DATABASE_URL when it is imported
+    os.environ['DATABASE_URL'] = args.database_url
+    from webhook import create_app
+    app = create_app()
+
+    results = {}
+    with app.app_context():
+        user, targets = benchmark_targets(args.client_id)
+        session_user = {'name': user.username, 'email': user.email}
+        dataset = dataset_size()
+
+    test_client = app.test_client()
+    with test_client.session_transaction() as session:
+        session['user'] = session_user
+
+    for name, url in targets.items():
+        results[name] = run_endpoint(test_client, url, args.requests, args.warmup)
+        print(f"{name:26} {results[name]['throughput_rps']:>8} req/s  p50 {results[name]['p50_ms']:>7} ms  "
+              f"p99 {results[name]['p99_ms']:>7} ms  {results[name]['queries_per_request']:>6} queries")
+
+    run = {
+        'timestamp': datetime.utcnow().isoformat(),
+        'revision': git_revision(),
+        'label': args.label,
+        'database': args.database_url.split(':', 1)[0],
+        'dataset': dataset,
+        'results': results,
+    }
+    with open(args.output, 'a') as f:
+        f.write(json.dumps(run) + '\n')
+    print(f'Results appended to {args.output}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+import argparse
+import os
+import time
+import numpy as np
+
+# Compares the old ORM + to_dict + jsonify serialization of a team's rating history with
+# the msgspec paths used by the history endpoints. Generate data first:
+#   python -m benchmarks.generate_data --database-url sqlite:///bench.db
+#   python -m benchmarks.serialization_benchmark --database-url sqlite:///bench.db
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark rating history serialization')
+    parser.add_argument('--database-url', default='sqlite:///bench.db')
+    parser.add_argument('--team-id', type=int, default=None, help='Defaults to the team with the most ratings')
+    parser.add_argument('--limit', type=int, default=5000, help='Ratings serialized per run')
+    parser.add_argument('--runs', type=int, default=50)
+    return parser.parse_args()
+
+def busiest_team():
+    from sqlalchemy import func
+    from models import db, TeamMember, Rating
+    return db.session.query(TeamMember.team_id).join(Rating, Rating.team_member_id == TeamMember.id).group_by(
+        TeamMember.team_id
+    ).order_by(func.count(Rating.id).desc()).limit(1).scalar()
+
+def orm_path(app, team_id, limit):
+    from models import db, TeamMember, Rating
+    rows = db.session.query(Rating, TeamMember).join(
+        TeamMember, Rating.team_member_id == TeamMember.id
+    ).filter(TeamMember.team_id == team_id).order_by(Rating.timestamp.desc(), Rating.id.desc()).limit(limit).all()
+    members = {}
+    for rating, member in rows:
+        entry = members.setdefault(member.id, {
+            'id': member.id,
+            'first_name': member.first_name,
+            'surname': member.surname,
+            'employer_id': member.employer_id,
+            'ratings': []
+        })
+        entry['ratings'].append(rating.to_dict())
+    body = app.json.dumps({'team_id': team_id, 'members': list(members.values())})
+    db.session.expunge_all()
+    return body.encode()
+
+def _column_rows(team_id, limit):
+    from models import db, TeamMember, Rating
+    from payloads import rating_columns
+    return db.session.query(
+        *rating_columns(Rating), TeamMember.first_name, TeamMember.surname, TeamMember.employer_id
+    ).join(TeamMember, Rating.team_member_id == TeamMember.id).filter(
+        TeamMember.team_id == team_id
+    ).order_by(Rating.timestamp.desc(), Rating.id.desc()).limit(limit).all()
+
+def msgspec_path(app, team_id, limit):
+    from payloads import RATING_FIELDS, TeamMemberHistoryPayload, rating_payloads, encode
+    rows = _column_rows(team_id, limit)
+    width = len(RATING_FIELDS)
+    members = {}
+    for row in rows:
+        if row.team_member_id not in members:
+            members[row.team_member_id] = TeamMemberHistoryPayload(
+                row.team_member_id, row.first_name, row.surname, row.employer_id, []
+            )
+    for payload in rating_payloads([row[:width] for row in rows]):
+        members[payload.team_member_id].ratings.append(payload)
+    return encode({'team_id': team_id, 'members': list(members.values())})
+
+def columnar_path(app, team_id, limit):
+    from payloads import RATING_FIELDS, columnar, encode
+    rows = _column_rows(team_id, limit)
+    width = len(RATING_FIELDS)
+    return encode({'team_id': team_id, 'columns': columnar([row[:width] for row in rows], RATING_FIELDS)})
+
+PATHS = {
+    'orm_to_dict_jsonify': orm_path,
+    'msgspec_rows': msgspec_path,
+    'msgspec_columnar': columnar_path,
+}
+
+def run_path(func, app, team_id, limit, runs):
+    body = func(app, team_id, limit)
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func(app, team_id, limit)
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        'p50_ms': round(float(np.percentile(timings, 50)), 2),
+        'p99_ms': round(float(np.percentile(timings, 99)), 2),
+        'bytes': len(body),
+    }
+
+def main():
+    args = parse_args()
+    # Config reads DATABASE_URL when it is imported
+    os.environ['DATABASE_URL'] = args.database_url
+    from webhook import create_app
+    app = create_app()
+
+    with app.app_context():
+        team_id = args.team_id or busiest_team()
+        print(f'Team {team_id}, up to {args.limit} ratings, {args.runs} runs')
+        baseline = None
+        for name, func in PATHS.items():
+            result = run_path(func, app, team_id, args.limit, args.runs)
+            baseline = baseline or result['p50_ms']
+            print(f"{name:22} p50 {result['p50_ms']:>8} ms  p99 {result['p99_ms']:>8} ms  "
+                  f"{result['bytes']:>10} bytes  {baseline / result['p50_ms']:>5.1f}x")
+
+if __name__ == '__main__':
+    main()
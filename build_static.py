@@ -0,0 +1,93 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+
+# Build step for static assets, run on deploy (bin/post_compile):
+# - copies every file to a content-hashed name (images/Boost.png -> images/Boost.1a2b3c4d5e6f.png)
+# - writes gzip (and brotli, if installed) variants that WhiteNoise serves automatically
+# - writes resized WebP copies of PNG/JPEG images (requires Pillow)
+# - records everything in static/staticfiles.json, read by assets.py
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+MANIFEST_NAME = 'staticfiles.json'
+HASHED_RE = re.compile(r'\.[0-9a-f]{12}\.')
+COMPRESSIBLE = {'.css', '.js', '.svg', '.json', '.txt', '.html', '.map', '.xml', '.ico'}
+IMAGE_TYPES = {'.png', '.jpg', '.jpeg'}
+WEBP_WIDTHS = (480, 960, 1440)
+WEBP_QUALITY = 80
+
+def file_hash(path):
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+def hashed_name(relative_path, digest, suffix=''):
+    root, ext = os.path.splitext(relative_path)
+    return f'{root}{suffix}.{digest}{ext}'
+
+def compress(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    with gzip.open(f'{path}.gz', 'wb', compresslevel=9) as f:
+        f.write(data)
+    try:
+        import brotli
+    except ImportError:
+        return
+    with open(f'{path}.br', 'wb') as f:
+        f.write(brotli.compress(data))
+
+def write_webp(source_path, relative_path):
+    try:
+        from PIL import Image
+    except ImportError:
+        return {}
+    variants = {}
+    root, _ = os.path.splitext(relative_path)
+    with Image.open(source_path) as image:
+        image.load()
+        widths = [width for width in WEBP_WIDTHS if width < image.width] + [image.width]
+        for width in widths:
+            height = round(image.height * width / image.width)
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            temp_path = os.path.join(STATIC_DIR, f'{root}-{width}w.tmp.webp')
+            resized.save(temp_path, 'WEBP', quality=WEBP_QUALITY, method=6)
+            name = hashed_name(f'{root}.webp', file_hash(temp_path), f'-{width}w')
+            os.replace(temp_path, os.path.join(STATIC_DIR, name))
+            variants[str(width)] = name.replace(os.sep, '/')
+    return variants
+
+def build():
+    manifest = {'paths': {}, 'webp': {}}
+    for directory, _, files in os.walk(STATIC_DIR):
+        for filename in files:
+            if filename == MANIFEST_NAME or HASHED_RE.search(filename) or filename.endswith(('.gz', '.br')):
+                continue
+            source_path = os.path.join(directory, filename)
+            relative_path = os.path.relpath(source_path, STATIC_DIR)
+            name = hashed_name(relative_path, file_hash(source_path))
+            target_path = os.path.join(STATIC_DIR, name)
+            if not os.path.exists(target_path):
+                shutil.copy2(source_path, target_path)
+            ext = os.path.splitext(filename)[1].lower()
+            if ext in COMPRESSIBLE:
+                compress(target_path)
+            key = relative_path.replace(os.sep, '/')
+            manifest['paths'][key] = name.replace(os.sep, '/')
+            if ext in IMAGE_TYPES:
+                variants = write_webp(source_path, relative_path)
+                if variants:
+                    manifest['webp'][key] = variants
+
+    with open(os.path.join(STATIC_DIR, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+if __name__ == '__main__':
+    manifest = build()
+    print(f"Hashed {len(manifest['paths'])} files, {len(manifest['webp'])} images with WebP variants")
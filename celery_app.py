@@ -15,3 +15,10 @@ def make_celery(app):
     
     celery.Task = ContextTask
     return celery
+
+def get_celery(app):
+    # Built on first use so web processes that never queue a task skip importing Celery's machinery
+    celery = app.extensions.get('celery')
+    if celery is None:
+        celery = app.extensions['celery'] = make_celery(app)
+    return celery
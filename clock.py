@@ -0,0 +1,16 @@
+import time
+import logging
+from webhook import create_app
+from scheduler import start_scheduler
+
+# Start with: python clock.py
+# Run exactly one clock process; every web or Celery process starting the scheduler would repeat each job.
+if __name__ == '__main__':
+    app = create_app()
+    scheduler = start_scheduler(app)
+    try:
+        while True:
+            time.sleep(60)
+    except (KeyboardInterrupt, SystemExit):
+        logging.info("Scheduler stopping...")
+        scheduler.shutdown()
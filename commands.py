@@ -0,0 +1,43 @@
+import sys
+import click
+from rollups import rebuild_rollups
+from export import EXPORT_FORMATS, export_ratings
+from notifications import refresh_next_due
+from models import db
+from archive import archive_ratings
+
+def register_commands(app):
+    @app.cli.command('rebuild-rollups')
+    @click.option('--client-id', type=int, default=None, help='Only rebuild rollups for this client.')
+    def rebuild_rollups_command(client_id):
+        count = rebuild_rollups(client_id=client_id)
+        click.echo(f'Rebuilt {count} rollup rows.')
+
+    @app.cli.command('export-ratings')
+    @click.argument('client_id', type=int)
+    @click.option('--format', 'export_format', type=click.Choice(EXPORT_FORMATS), default='csv')
+    @click.option('--since', type=click.DateTime(), default=None, help='Only export ratings newer than this.')
+    @click.option('--output', type=click.Path(dir_okay=False), default=None, help='Defaults to stdout.')
+    def export_ratings_command(client_id, export_format, since, output):
+        stream = open(output, 'w', newline='', encoding='utf-8') if output else sys.stdout
+        try:
+            for chunk in export_ratings(client_id, export_format, since):
+                stream.write(chunk)
+        finally:
+            if output:
+                stream.close()
+
+    @app.cli.command('refresh-rating-due-dates')
+    @click.option('--client-id', type=int, default=None, help='Only refresh teams of this client.')
+    def refresh_rating_due_dates_command(client_id):
+        count = refresh_next_due(db.session, client_id)
+        db.session.commit()
+        click.echo(f'Refreshed the next rating due date of {count} teams.')
+
+    @app.cli.command('archive-ratings')
+    @click.option('--days', type=int, default=None, help='Archive ratings older than this many days.')
+    def archive_ratings_command(days):
+        days = days or app.config['ARCHIVE_AFTER_DAYS']
+        if not days:
+            raise click.UsageError('Pass --days or set ARCHIVE_AFTER_DAYS.')
+        click.echo(f'Archived {archive_ratings(days)} ratings.')
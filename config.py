@@ -1,4 +1,5 @@
 import os
+from datetime import timedelta
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -6,12 +7,73 @@ load_dotenv()
 class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///site.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Each gunicorn worker gets its own pool: one connection per request thread plus a little overflow.
+    # Keep WEB_CONCURRENCY * (DB_POOL_SIZE + DB_MAX_OVERFLOW) below the database's connection limit.
+    WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', 2))
+    WEB_THREADS = int(os.getenv('WEB_THREADS', 4))
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', WEB_THREADS))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 2))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))
+    SQLALCHEMY_ENGINE_OPTIONS = {'pool_pre_ping': True, 'pool_recycle': DB_POOL_RECYCLE}
+    if not SQLALCHEMY_DATABASE_URI.startswith('sqlite'):
+        SQLALCHEMY_ENGINE_OPTIONS.update({'pool_size': DB_POOL_SIZE, 'max_overflow': DB_MAX_OVERFLOW})
+    # Optional read replica. Safe-method requests and REPLICA_READ_BLUEPRINTS read from it; a client that
+    # wrote stays on the primary for REPLICA_STICKY_SECONDS. For a local setup, point it at a copy of the
+    # primary, e.g. sqlite:///replica.db
+    REPLICA_DATABASE_URL = os.getenv('REPLICA_DATABASE_URL')
+    SQLALCHEMY_BINDS = {'replica': REPLICA_DATABASE_URL} if REPLICA_DATABASE_URL else {}
+    REPLICA_READ_BLUEPRINTS = [name for name in os.getenv('REPLICA_READ_BLUEPRINTS', 'team_history,export').split(',') if name]
+    REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', 5))
+    REPLICA_HEALTH_TTL = int(os.getenv('REPLICA_HEALTH_TTL', 30))
     AUTH0_CLIENT_ID = os.getenv('AUTH0_CLIENT_ID')
     AUTH0_CLIENT_SECRET = os.getenv('AUTH0_CLIENT_SECRET')
     AUTH0_DOMAIN = os.getenv('AUTH0_DOMAIN')
     AUTH0_CALLBACK_URL = os.getenv('AUTH0_CALLBACK_URL')
     AUTH0_AUDIENCE = os.getenv('AUTH0_AUDIENCE')
     SECRET_KEY = os.getenv('SECRET_KEY')
-    SESSION_TYPE = 'filesystem'
+    # filesystem only works for a single process; use redis or sqlalchemy when running several workers
+    SESSION_TYPE = os.getenv('SESSION_TYPE', 'filesystem')
+    SESSION_FILE_DIR = os.getenv('SESSION_FILE_DIR', './.flask_session/')
+    SESSION_REDIS_URL = os.getenv('SESSION_REDIS_URL', os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+    SESSION_SQLALCHEMY_TABLE = 'flask_sessions'
+    SESSION_KEY_PREFIX = 'session:'
     SESSION_PERMANENT = False
     SESSION_USE_SIGNER = True
+    # Only write the session back when it changed; stored sessions expire after this many seconds
+    SESSION_REFRESH_EACH_REQUEST = False
+    PERMANENT_SESSION_LIFETIME = timedelta(seconds=int(os.getenv('SESSION_LIFETIME', 86400)))
+    CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+    CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+    # Per-endpoint query counts and latency, served on /metrics (requires METRICS_TOKEN outside debug)
+    INSTRUMENTATION_ENABLED = os.getenv('INSTRUMENTATION_ENABLED', 'true').lower() == 'true'
+    SERVER_TIMING_HEADER = os.getenv('SERVER_TIMING_HEADER', 'false').lower() == 'true'
+    N_PLUS_ONE_THRESHOLD = int(os.getenv('N_PLUS_ONE_THRESHOLD', 5))
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+    # Production boot: schema is left to migrations and OIDC discovery is read from a local cache.
+    # Every Procfile process sets it; create_all on boot is for local development only.
+    FAST_START = os.getenv('FAST_START', 'false').lower() == 'true'
+    AUTO_CREATE_SCHEMA = os.getenv('AUTO_CREATE_SCHEMA', 'false' if FAST_START else 'true').lower() == 'true'
+    OIDC_METADATA_CACHE = os.getenv('OIDC_METADATA_CACHE', './.oidc_metadata.json' if FAST_START else '')
+    OIDC_METADATA_MAX_AGE = int(os.getenv('OIDC_METADATA_MAX_AGE', 86400))
+    STARTUP_BUDGET_SECONDS = float(os.getenv('STARTUP_BUDGET_SECONDS', 2.0))
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    # Cache lifetime for static files without a content hash; hashed files are cached forever
+    STATIC_MAX_AGE = int(os.getenv('STATIC_MAX_AGE', 3600))
+    # Response cache for teams, team members and settings: simple (per process), redis (shared) or none.
+    # simple is only allowed with a single worker, since a write only invalidates its own worker's copy.
+    RESPONSE_CACHE_TYPE = os.getenv('RESPONSE_CACHE_TYPE', 'redis' if WEB_CONCURRENCY > 1 else 'simple')
+    RESPONSE_CACHE_REDIS_URL = os.getenv('RESPONSE_CACHE_REDIS_URL', os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+    RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', 2048))
+    RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', 300))
+    RESPONSE_CACHE_REDIS_TIMEOUT = float(os.getenv('RESPONSE_CACHE_REDIS_TIMEOUT', 0.5))
+    MAIL_SERVER = os.getenv('MAIL_SERVER')
+    MAIL_PORT = int(os.getenv('MAIL_PORT', 587))
+    MAIL_USE_TLS = os.getenv('MAIL_USE_TLS', 'true').lower() == 'true'
+    MAIL_USE_SSL = os.getenv('MAIL_USE_SSL', 'false').lower() == 'true'
+    MAIL_USERNAME = os.getenv('MAIL_USERNAME')
+    MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
+    MAIL_DEFAULT_SENDER = os.getenv('MAIL_DEFAULT_SENDER')
+    REMINDER_TICK_MINUTES = int(os.getenv('REMINDER_TICK_MINUTES', 60))
+    REMINDER_BATCH_SIZE = int(os.getenv('REMINDER_BATCH_SIZE', 50))
+    # Ratings older than this move to rating_archive once a day; 0 disables archiving
+    ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', 730))
@@ -0,0 +1,145 @@
+import logging
+import threading
+import time
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, inspect, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.sql.dml import UpdateBase
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+REPLICA_BIND_KEY = 'replica'
+STICKY_COOKIE = 'db_primary_until'
+
+class ReplicaRouter:
+    def __init__(self, engine, read_blueprints, primary_tables, sticky_seconds, health_ttl):
+        self.engine = engine
+        self.read_blueprints = read_blueprints
+        # Tables that must never be read stale, e.g. the server-side session store
+        self.primary_tables = primary_tables
+        self.sticky_seconds = sticky_seconds
+        self.health_ttl = health_ttl
+        self.down_until = 0.0
+        self.healthy = False
+        self.checked_at = 0.0
+        self._probe_lock = threading.Lock()
+
+    def mark_down(self, reason):
+        if self.down_until < time.monotonic():
+            logging.warning(f"Read replica unavailable, reading from primary for {self.health_ttl}s: {reason}")
+        self.down_until = time.monotonic() + self.health_ttl
+        self.healthy = False
+        self.checked_at = 0.0
+
+    def available(self):
+        now = time.monotonic()
+        if self.down_until > now:
+            return False
+        # The replica is probed again every health_ttl seconds
+        if now - self.checked_at < self.health_ttl:
+            return self.healthy
+        # One thread probes; the others keep the last known state until it answers
+        if not self._probe_lock.acquire(blocking=False):
+            return self.healthy
+        try:
+            with self.engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
+            self.healthy = True
+            self.checked_at = time.monotonic()
+        except Exception as e:
+            self.mark_down(e)
+        finally:
+            self._probe_lock.release()
+        return self.healthy
+
+    def request_allows_replica(self):
+        if g.get('db_wrote'):
+            return False
+        if request.method not in SAFE_METHODS and request.blueprint not in self.read_blueprints:
+            return False
+        # Read-your-writes: a client that wrote recently stays on the primary until the replica catches up
+        try:
+            return float(request.cookies.get(STICKY_COOKIE, 0)) < time.time()
+        except ValueError:
+            return True
+
+def _is_write(session, clause):
+    if session._flushing or isinstance(clause, UpdateBase):
+        return True
+    return getattr(clause, '_for_update_arg', None) is not None
+
+class RoutingSession(Session):
+    _replica_read = False
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None or not has_request_context():
+            return engine
+        router = current_app.extensions.get('read_replica')
+        if router is None or engine is not self._db.engine:
+            return engine
+        if _is_write(self, clause):
+            g.db_wrote = True
+            return engine
+        # Callers may pass a model class rather than its mapper
+        if mapper is not None and inspect(mapper).persist_selectable.name in router.primary_tables:
+            return engine
+        if router.request_allows_replica() and router.available():
+            self._replica_read = True
+            return router.engine
+        return engine
+
+    def _with_fallback(self, method, *args, **kwargs):
+        self._replica_read = False
+        try:
+            return method(*args, **kwargs)
+        except OperationalError as e:
+            # A failed replica read is retried once on the primary. Rolling back drops the broken
+            # replica connection; it only discards reads, as pending changes would have routed to the primary.
+            if not self._replica_read or self.new or self.dirty or self.deleted:
+                raise
+            current_app.extensions['read_replica'].mark_down(e)
+            self.rollback()
+            self._replica_read = False
+            return method(*args, **kwargs)
+
+    def execute(self, *args, **kwargs):
+        return self._with_fallback(super().execute, *args, **kwargs)
+
+    def scalars(self, *args, **kwargs):
+        return self._with_fallback(super().scalars, *args, **kwargs)
+
+    def scalar(self, *args, **kwargs):
+        return self._with_fallback(super().scalar, *args, **kwargs)
+
+def init_read_replica(app, db):
+    if REPLICA_BIND_KEY not in app.config.get('SQLALCHEMY_BINDS', {}):
+        return None
+
+    with app.app_context():
+        engine = db.engines[REPLICA_BIND_KEY]
+    primary_tables = set()
+    if app.config['SESSION_TYPE'] == 'sqlalchemy':
+        primary_tables.add(app.config['SESSION_SQLALCHEMY_TABLE'])
+    router = ReplicaRouter(
+        engine,
+        read_blueprints=set(app.config['REPLICA_READ_BLUEPRINTS']),
+        primary_tables=primary_tables,
+        sticky_seconds=app.config['REPLICA_STICKY_SECONDS'],
+        health_ttl=app.config['REPLICA_HEALTH_TTL']
+    )
+    app.extensions['read_replica'] = router
+
+    @event.listens_for(engine, 'handle_error')
+    def replica_error(context):
+        if context.is_disconnect or context.connection is None:
+            router.mark_down(context.original_exception)
+
+    @app.after_request
+    def stick_to_primary(response):
+        if g.get('db_wrote') and router.sticky_seconds:
+            response.set_cookie(STICKY_COOKIE, str(time.time() + router.sticky_seconds),
+                                max_age=router.sticky_seconds, httponly=True, samesite='Lax')
+        return response
+
+    return router
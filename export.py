@@ -0,0 +1,67 @@
+import csv
+import io
+import json
+from sqlalchemy import select
+from models import db, Rating, RatingArchive, TeamMember, Team, RATING_CRITERIA
+from archive import reaches_archive
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+
+EXPORT_COLUMNS = (
+    'rating_id', 'timestamp', 'team_id', 'team_name', 'team_member_id', 'first_name', 'surname', 'employer_id'
+) + RATING_CRITERIA + ('total_score', 'avg_score')
+
+def _client_ratings_query(model, client_id, since):
+    query = select(
+        model.id.label('rating_id'),
+        model.timestamp,
+        Team.id.label('team_id'),
+        Team.name.label('team_name'),
+        TeamMember.id.label('team_member_id'),
+        TeamMember.first_name,
+        TeamMember.surname,
+        TeamMember.employer_id,
+        *[getattr(model, name) for name in RATING_CRITERIA],
+        model.total_score,
+        model.avg_score
+    ).join(TeamMember, model.team_member_id == TeamMember.id).join(
+        Team, TeamMember.team_id == Team.id
+    ).where(Team.client_id == client_id)
+    if since is not None:
+        query = query.where(model.timestamp > since)
+    return query.order_by(model.timestamp, model.id)
+
+def iter_client_ratings(client_id, since=None, batch_size=1000):
+    # Archived ratings are all older than hot ones, so reading the archive first keeps timestamp order
+    models = (Rating,) if since is not None and not reaches_archive(since) else (RatingArchive, Rating)
+    for model in models:
+        query = _client_ratings_query(model, client_id, since)
+        # yield_per streams from a server-side cursor, so memory stays flat however many ratings a client has
+        for row in db.session.execute(query.execution_options(yield_per=batch_size)).mappings():
+            row = dict(row)
+            row['timestamp'] = row['timestamp'].isoformat() if row['timestamp'] else None
+            yield row
+
+def iter_csv(rows, batch_size=500):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def iter_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row) + '\n'
+
+def export_ratings(client_id, export_format='csv', since=None):
+    rows = iter_client_ratings(client_id, since=since)
+    if export_format == 'csv':
+        return iter_csv(rows)
+    if export_format == 'ndjson':
+        return iter_ndjson(rows)
+    raise ValueError(f'Unsupported export format: {export_format}')
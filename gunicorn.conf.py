@@ -0,0 +1,24 @@
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+threads = int(os.getenv('WEB_THREADS', 4))
+worker_class = 'gthread'
+
+# Load the app once in the master so workers fork with it already imported
+preload_app = True
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+keepalive = 5
+# Recycle workers now and then to bound memory growth
+max_requests = 1000
+max_requests_jitter = 100
+accesslog = '-'
+
+def post_fork(server, worker):
+    # Connections opened while preloading belong to the master; each worker starts its own pool
+    from models import db
+    app = server.app.wsgi()
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
@@ -0,0 +1,151 @@
+import os
+import time
+import logging
+import threading
+from collections import Counter
+from flask import g, request, jsonify, abort, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot counts values above the largest bucket
+        self.total = 0
+        self.count = 0
+
+    def observe(self, value):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.total += value
+        self.count += 1
+
+    def to_dict(self):
+        labels = [f'<={bound}' for bound in self.buckets] + [f'>{self.buckets[-1]}']
+        return {
+            'buckets': dict(zip(labels, self.counts)),
+            'count': self.count,
+            'sum': round(self.total, 3),
+            'mean': round(self.total / self.count, 3) if self.count else 0
+        }
+
+class EndpointMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.latency_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.sql_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.query_count = Histogram(QUERY_COUNT_BUCKETS)
+        self.n_plus_one = 0
+        self.repeated_statements = {}
+
+    def to_dict(self):
+        return {
+            'requests': self.requests,
+            'latency_ms': self.latency_ms.to_dict(),
+            'sql_ms': self.sql_ms.to_dict(),
+            'query_count': self.query_count.to_dict(),
+            'n_plus_one': self.n_plus_one,
+            'repeated_statements': self.repeated_statements
+        }
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+
+    def record(self, endpoint, latency_ms, query_count, sql_ms, repeated):
+        with self.lock:
+            metrics = self.endpoints.get(endpoint)
+            if metrics is None:
+                metrics = self.endpoints[endpoint] = EndpointMetrics()
+            metrics.requests += 1
+            metrics.latency_ms.observe(latency_ms)
+            metrics.sql_ms.observe(sql_ms)
+            metrics.query_count.observe(query_count)
+            if repeated:
+                metrics.n_plus_one += 1
+                for statement, count in repeated.items():
+                    metrics.repeated_statements[statement] = max(metrics.repeated_statements.get(statement, 0), count)
+
+    def snapshot(self):
+        with self.lock:
+            return {endpoint: metrics.to_dict() for endpoint, metrics in self.endpoints.items()}
+
+    def reset(self):
+        with self.lock:
+            self.endpoints = {}
+
+metrics = MetricsRegistry()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'sql_stats' in g:
+        conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not (has_request_context() and 'sql_stats' in g):
+        return
+    starts = conn.info.get('query_start_time')
+    if not starts:
+        return
+    stats = g.sql_stats
+    stats['count'] += 1
+    stats['time'] += time.perf_counter() - starts.pop()
+    stats['statements'][statement] += 1
+
+def init_instrumentation(app):
+    app.config.setdefault('INSTRUMENTATION_ENABLED', True)
+    app.config.setdefault('SERVER_TIMING_HEADER', False)
+    app.config.setdefault('N_PLUS_ONE_THRESHOLD', 5)
+    app.config.setdefault('METRICS_TOKEN', os.getenv('METRICS_TOKEN'))
+    if not app.config['INSTRUMENTATION_ENABLED']:
+        return
+
+    # Listening on the Engine class covers the primary database and any extra binds
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def start_request_timer():
+        g.request_start = time.perf_counter()
+        g.sql_stats = {'count': 0, 'time': 0.0, 'statements': Counter()}
+
+    @app.after_request
+    def record_request_metrics(response):
+        stats = g.get('sql_stats')
+        if stats is None:
+            return response
+        latency_ms = (time.perf_counter() - g.request_start) * 1000
+        sql_ms = stats['time'] * 1000
+        endpoint = request.endpoint or 'unmatched'
+
+        # The same statement run many times in one request is almost always a query inside a loop
+        threshold = app.config['N_PLUS_ONE_THRESHOLD']
+        repeated = {statement: count for statement, count in stats['statements'].items() if count >= threshold}
+        if repeated:
+            logging.warning(f"Possible N+1 in {endpoint}: {max(repeated.values())} identical statements")
+
+        metrics.record(endpoint, latency_ms, stats['count'], sql_ms, repeated)
+        if app.config['SERVER_TIMING_HEADER']:
+            response.headers['Server-Timing'] = (
+                f'db;dur={sql_ms:.1f};desc="{stats["count"]} queries", app;dur={latency_ms:.1f}'
+            )
+        return response
+
+    @app.route('/metrics')
+    def request_metrics():
+        token = app.config['METRICS_TOKEN']
+        if token:
+            if request.headers.get('Authorization') != f'Bearer {token}':
+                abort(403)
+        elif not app.debug:
+            abort(404)
+        # Counters are per process; each worker reports its own
+        return jsonify({'pid': os.getpid(), 'endpoints': metrics.snapshot()})
@@ -0,0 +1,47 @@
+"""rating archive table
+
+Revision ID: 0a6e4c2d8f19
+Revises: f5d1a9c7e3b2
+Create Date: 2026-10-17 20:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a6e4c2d8f19'
+down_revision = 'f5d1a9c7e3b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'rating_archive' in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table('rating_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('team_member_id', sa.Integer(), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('ability_to_impart_knowledge', sa.Integer(), nullable=False),
+        sa.Column('approachable', sa.Integer(), nullable=False),
+        sa.Column('necessary_skills', sa.Integer(), nullable=False),
+        sa.Column('trained', sa.Integer(), nullable=False),
+        sa.Column('absence', sa.Integer(), nullable=False),
+        sa.Column('self_motivation', sa.Integer(), nullable=False),
+        sa.Column('capacity_for_learning', sa.Integer(), nullable=False),
+        sa.Column('adaptability', sa.Integer(), nullable=False),
+        sa.Column('total_score', sa.Integer(), nullable=False),
+        sa.Column('avg_score', sa.Float(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_rating_archive_member_timestamp_id', 'rating_archive',
+                    ['team_member_id', 'timestamp', 'id'])
+    op.create_index('ix_rating_archive_timestamp', 'rating_archive', ['timestamp'])
+
+
+def downgrade():
+    op.drop_index('ix_rating_archive_timestamp', table_name='rating_archive')
+    op.drop_index('ix_rating_archive_member_timestamp_id', table_name='rating_archive')
+    op.drop_table('rating_archive')
@@ -0,0 +1,116 @@
+"""baseline schema
+
+Revision ID: a1c0e5f3b2d4
+Revises: 
+Create Date: 2026-10-17 20:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c0e5f3b2d4'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+# Schema as db.create_all() built it before migrations were introduced. Existing
+# databases already have these tables, so each one is only created when missing.
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'client' not in existing:
+        op.create_table('client',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=80), nullable=False),
+            sa.Column('tier', sa.Integer(), nullable=True),
+            sa.Column('email', sa.String(length=120), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('email')
+        )
+    if 'user' not in existing:
+        op.create_table('user',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('username', sa.String(length=80), nullable=False),
+            sa.Column('email', sa.String(length=120), nullable=False),
+            sa.Column('password_hash', sa.String(length=128), nullable=True),
+            sa.Column('is_admin', sa.Boolean(), nullable=True),
+            sa.Column('client_id', sa.Integer(), nullable=False),
+            sa.Column('auth0_id', sa.String(length=120), nullable=True),
+            sa.ForeignKeyConstraint(['client_id'], ['client.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('auth0_id'),
+            sa.UniqueConstraint('email'),
+            sa.UniqueConstraint('username')
+        )
+    if 'team' not in existing:
+        op.create_table('team',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=100), nullable=False),
+            sa.Column('client_id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=True),
+            sa.ForeignKeyConstraint(['client_id'], ['client.id']),
+            sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if 'team_member' not in existing:
+        op.create_table('team_member',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('first_name', sa.String(length=100), nullable=False),
+            sa.Column('surname', sa.String(length=100), nullable=False),
+            sa.Column('employer_id', sa.String(length=100), nullable=False),
+            sa.Column('team_id', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['team_id'], ['team.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if 'rating' not in existing:
+        op.create_table('rating',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('team_member_id', sa.Integer(), nullable=False),
+            sa.Column('timestamp', sa.DateTime(), nullable=True),
+            sa.Column('ability_to_impart_knowledge', sa.Integer(), nullable=False),
+            sa.Column('approachable', sa.Integer(), nullable=False),
+            sa.Column('necessary_skills', sa.Integer(), nullable=False),
+            sa.Column('trained', sa.Integer(), nullable=False),
+            sa.Column('absence', sa.Integer(), nullable=False),
+            sa.Column('self_motivation', sa.Integer(), nullable=False),
+            sa.Column('capacity_for_learning', sa.Integer(), nullable=False),
+            sa.Column('adaptability', sa.Integer(), nullable=False),
+            sa.Column('total_score', sa.Integer(), nullable=False),
+            sa.Column('avg_score', sa.Float(), nullable=False),
+            sa.ForeignKeyConstraint(['team_member_id'], ['team_member.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if 'settings' not in existing:
+        op.create_table('settings',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('client_id', sa.Integer(), nullable=False),
+            sa.Column('red_min', sa.Integer(), nullable=True),
+            sa.Column('red_max', sa.Integer(), nullable=True),
+            sa.Column('orange_min', sa.Integer(), nullable=True),
+            sa.Column('orange_max', sa.Integer(), nullable=True),
+            sa.Column('white_min', sa.Integer(), nullable=True),
+            sa.Column('white_max', sa.Integer(), nullable=True),
+            sa.Column('green_min', sa.Integer(), nullable=True),
+            sa.Column('green_max', sa.Integer(), nullable=True),
+            sa.Column('notify_1_week', sa.Boolean(), nullable=True),
+            sa.Column('notify_3_days', sa.Boolean(), nullable=True),
+            sa.Column('notify_1_day', sa.Boolean(), nullable=True),
+            sa.Column('frequency_weekly', sa.Boolean(), nullable=True),
+            sa.Column('frequency_bi_weekly', sa.Boolean(), nullable=True),
+            sa.Column('frequency_monthly', sa.Boolean(), nullable=True),
+            sa.Column('frequency_quarterly', sa.Boolean(), nullable=True),
+            sa.ForeignKeyConstraint(['client_id'], ['client.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+
+def downgrade():
+    op.drop_table('settings')
+    op.drop_table('rating')
+    op.drop_table('team_member')
+    op.drop_table('team')
+    op.drop_table('user')
+    op.drop_table('client')
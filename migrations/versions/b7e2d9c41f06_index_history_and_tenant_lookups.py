@@ -0,0 +1,43 @@
+"""index history and tenant lookups
+
+Revision ID: b7e2d9c41f06
+Revises: a1c0e5f3b2d4
+Create Date: 2026-10-17 20:12:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2d9c41f06'
+down_revision = 'a1c0e5f3b2d4'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = (
+    ('ix_rating_member_timestamp_id', 'rating', ['team_member_id', 'timestamp', 'id']),
+    ('ix_team_member_team_id', 'team_member', ['team_id']),
+    ('ix_team_client_id', 'team', ['client_id']),
+    ('ix_team_user_id', 'team', ['user_id']),
+    ('ix_user_client_id', 'user', ['client_id']),
+    ('ix_settings_client_id', 'settings', ['client_id']),
+)
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    existing = {table: {index['name'] for index in inspector.get_indexes(table)} for _, table, _ in INDEXES}
+    # CREATE INDEX CONCURRENTLY keeps rating writable while the release phase builds the
+    # index on Postgres. It cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            if name not in existing[table]:
+                op.create_index(name, table, columns, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
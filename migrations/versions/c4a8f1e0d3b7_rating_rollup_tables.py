@@ -0,0 +1,69 @@
+"""rating rollup tables
+
+Revision ID: c4a8f1e0d3b7
+Revises: b7e2d9c41f06
+Create Date: 2026-10-17 20:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4a8f1e0d3b7'
+down_revision = 'b7e2d9c41f06'
+branch_labels = None
+depends_on = None
+
+
+# Rollups start empty; fill them from existing ratings with flask rebuild-rollups
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'member_rating_rollup' not in existing:
+        op.create_table('member_rating_rollup',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('team_member_id', sa.Integer(), nullable=False),
+            sa.Column('period', sa.String(length=20), nullable=False),
+            sa.Column('period_start', sa.DateTime(), nullable=False),
+            sa.Column('rating_count', sa.Integer(), nullable=False),
+            sa.Column('sum_ability_to_impart_knowledge', sa.Integer(), nullable=False),
+            sa.Column('sum_approachable', sa.Integer(), nullable=False),
+            sa.Column('sum_necessary_skills', sa.Integer(), nullable=False),
+            sa.Column('sum_trained', sa.Integer(), nullable=False),
+            sa.Column('sum_absence', sa.Integer(), nullable=False),
+            sa.Column('sum_self_motivation', sa.Integer(), nullable=False),
+            sa.Column('sum_capacity_for_learning', sa.Integer(), nullable=False),
+            sa.Column('sum_adaptability', sa.Integer(), nullable=False),
+            sa.Column('sum_total_score', sa.Integer(), nullable=False),
+            sa.Column('sum_avg_score', sa.Float(), nullable=False),
+            sa.ForeignKeyConstraint(['team_member_id'], ['team_member.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('team_member_id', 'period', 'period_start')
+        )
+    if 'team_rating_rollup' not in existing:
+        op.create_table('team_rating_rollup',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('team_id', sa.Integer(), nullable=False),
+            sa.Column('period', sa.String(length=20), nullable=False),
+            sa.Column('period_start', sa.DateTime(), nullable=False),
+            sa.Column('rating_count', sa.Integer(), nullable=False),
+            sa.Column('sum_ability_to_impart_knowledge', sa.Integer(), nullable=False),
+            sa.Column('sum_approachable', sa.Integer(), nullable=False),
+            sa.Column('sum_necessary_skills', sa.Integer(), nullable=False),
+            sa.Column('sum_trained', sa.Integer(), nullable=False),
+            sa.Column('sum_absence', sa.Integer(), nullable=False),
+            sa.Column('sum_self_motivation', sa.Integer(), nullable=False),
+            sa.Column('sum_capacity_for_learning', sa.Integer(), nullable=False),
+            sa.Column('sum_adaptability', sa.Integer(), nullable=False),
+            sa.Column('sum_total_score', sa.Integer(), nullable=False),
+            sa.Column('sum_avg_score', sa.Float(), nullable=False),
+            sa.ForeignKeyConstraint(['team_id'], ['team.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('team_id', 'period', 'period_start')
+        )
+
+
+def downgrade():
+    op.drop_table('team_rating_rollup')
+    op.drop_table('member_rating_rollup')
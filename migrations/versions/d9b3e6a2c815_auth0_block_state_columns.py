@@ -0,0 +1,35 @@
+"""auth0 block state columns
+
+Revision ID: d9b3e6a2c815
+Revises: c4a8f1e0d3b7
+Create Date: 2026-10-17 20:25:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9b3e6a2c815'
+down_revision = 'c4a8f1e0d3b7'
+branch_labels = None
+depends_on = None
+
+
+def _columns(table):
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+# Both columns are nullable, so adding them does not rewrite either table
+def upgrade():
+    if 'payment_status' not in _columns('client'):
+        op.add_column('client', sa.Column('payment_status', sa.String(length=20), nullable=True))
+    if 'auth0_blocked' not in _columns('user'):
+        op.add_column('user', sa.Column('auth0_blocked', sa.Boolean(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.drop_column('auth0_blocked')
+    with op.batch_alter_table('client') as batch_op:
+        batch_op.drop_column('payment_status')
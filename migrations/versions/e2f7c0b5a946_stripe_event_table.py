@@ -0,0 +1,32 @@
+"""stripe event table
+
+Revision ID: e2f7c0b5a946
+Revises: d9b3e6a2c815
+Create Date: 2026-10-17 20:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2f7c0b5a946'
+down_revision = 'd9b3e6a2c815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'stripe_event' not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table('stripe_event',
+            sa.Column('id', sa.String(length=255), nullable=False),
+            sa.Column('type', sa.String(length=100), nullable=False),
+            sa.Column('payload', sa.Text(), nullable=False),
+            sa.Column('received_at', sa.DateTime(), nullable=True),
+            sa.Column('processed_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+
+def downgrade():
+    op.drop_table('stripe_event')
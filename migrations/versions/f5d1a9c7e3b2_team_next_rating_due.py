@@ -0,0 +1,32 @@
+"""team next rating due
+
+Revision ID: f5d1a9c7e3b2
+Revises: e2f7c0b5a946
+Create Date: 2026-10-17 20:35:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f5d1a9c7e3b2'
+down_revision = 'e2f7c0b5a946'
+branch_labels = None
+depends_on = None
+
+
+# Existing teams start without a due date; fill them with flask refresh-rating-due-dates
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'next_rating_due' not in {column['name'] for column in inspector.get_columns('team')}:
+        op.add_column('team', sa.Column('next_rating_due', sa.DateTime(), nullable=True))
+    if 'ix_team_next_rating_due' not in {index['name'] for index in inspector.get_indexes('team')}:
+        with op.get_context().autocommit_block():
+            op.create_index('ix_team_next_rating_due', 'team', ['next_rating_due'], postgresql_concurrently=True)
+
+
+def downgrade():
+    op.drop_index('ix_team_next_rating_due', table_name='team')
+    with op.batch_alter_table('team') as batch_op:
+        batch_op.drop_column('next_rating_due')
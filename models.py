@@ -1,8 +1,9 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
+from db_routing import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class Client(db.Model):
     __tablename__ = 'client'
@@ -10,6 +11,7 @@ class Client(db.Model):
     name = db.Column(db.String(80), nullable=False)
     tier = db.Column(db.Integer, default=0)  # 0: Free, 1: Basic, 2: Professional, 3: Enterprise
     email = db.Column(db.String(120), unique=True, nullable=False)  # Added email to link with Stripe
+    payment_status = db.Column(db.String(20), default='active')  # 'blocked' blocks every user of the client in Auth0
     users = db.relationship('User', backref='client', lazy=True)
     teams = db.relationship('Team', backref='client', lazy=True)
     settings = db.relationship('Settings', backref='client', uselist=False, lazy=True)  # One-to-One relationship
@@ -21,9 +23,10 @@ class User(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(128), nullable=True)  # Make nullable
     is_admin = db.Column(db.Boolean, default=False)
-    client_id = db.Column(db.Integer, db.ForeignKey('client.id'), nullable=False)
+    client_id = db.Column(db.Integer, db.ForeignKey('client.id'), nullable=False, index=True)
     teams = db.relationship('Team', backref='user', lazy=True)
     auth0_id = db.Column(db.String(120), unique=True, nullable=True)  # Add this line
+    auth0_blocked = db.Column(db.Boolean, nullable=True)  # Last blocked state pushed to Auth0, None if never pushed
 
     @property
     def password(self):
@@ -39,8 +42,9 @@ class User(db.Model):
 class Team(db.Model):
     id = db.Column(db.Integer, primary_key=True)  # Corrected syntax here
     name = db.Column(db.String(100), nullable=False)
-    client_id = db.Column(db.Integer, db.ForeignKey('client.id'), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)  # user_id can be nullable
+    client_id = db.Column(db.Integer, db.ForeignKey('client.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True, index=True)  # user_id can be nullable
+    next_rating_due = db.Column(db.DateTime, nullable=True, index=True)  # Latest rating plus the client's rating frequency
     members = db.relationship('TeamMember', backref='team', lazy=True)
 
 class TeamMember(db.Model):
@@ -48,10 +52,23 @@ class TeamMember(db.Model):
     first_name = db.Column(db.String(100), nullable=False)
     surname = db.Column(db.String(100), nullable=False)
     employer_id = db.Column(db.String(100), nullable=False)
-    team_id = db.Column(db.Integer, db.ForeignKey('team.id'), nullable=False)
+    team_id = db.Column(db.Integer, db.ForeignKey('team.id'), nullable=False, index=True)
     evaluations = db.relationship('Rating', backref='team_member', lazy=True)
 
+RATING_CRITERIA = (
+    'ability_to_impart_knowledge',
+    'approachable',
+    'necessary_skills',
+    'trained',
+    'absence',
+    'self_motivation',
+    'capacity_for_learning',
+    'adaptability',
+)
+
 class Rating(db.Model):
+    # History is always read per member, newest first, with (timestamp, id) as the keyset cursor
+    __table_args__ = (db.Index('ix_rating_member_timestamp_id', 'team_member_id', 'timestamp', 'id'),)
     id = db.Column(db.Integer, primary_key=True)
     team_member_id = db.Column(db.Integer, db.ForeignKey('team_member.id'), nullable=False)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
@@ -66,9 +83,47 @@ class Rating(db.Model):
     total_score = db.Column(db.Integer, nullable=False)
     avg_score = db.Column(db.Float, nullable=False)
 
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'team_member_id': self.team_member_id,
+            'timestamp': self.timestamp.isoformat() if self.timestamp else None,
+            'ability_to_impart_knowledge': self.ability_to_impart_knowledge,
+            'approachable': self.approachable,
+            'necessary_skills': self.necessary_skills,
+            'trained': self.trained,
+            'absence': self.absence,
+            'self_motivation': self.self_motivation,
+            'capacity_for_learning': self.capacity_for_learning,
+            'adaptability': self.adaptability,
+            'total_score': self.total_score,
+            'avg_score': self.avg_score
+        }
+
+class RatingArchive(db.Model):
+    # Ratings older than the archive horizon; same columns and ids as Rating, without the foreign key
+    __tablename__ = 'rating_archive'
+    __table_args__ = (db.Index('ix_rating_archive_member_timestamp_id', 'team_member_id', 'timestamp', 'id'),)
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    team_member_id = db.Column(db.Integer, nullable=False)
+    timestamp = db.Column(db.DateTime, nullable=False, index=True)
+    ability_to_impart_knowledge = db.Column(db.Integer, nullable=False)
+    approachable = db.Column(db.Integer, nullable=False)
+    necessary_skills = db.Column(db.Integer, nullable=False)
+    trained = db.Column(db.Integer, nullable=False)
+    absence = db.Column(db.Integer, nullable=False)
+    self_motivation = db.Column(db.Integer, nullable=False)
+    capacity_for_learning = db.Column(db.Integer, nullable=False)
+    adaptability = db.Column(db.Integer, nullable=False)
+    total_score = db.Column(db.Integer, nullable=False)
+    avg_score = db.Column(db.Float, nullable=False)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    to_dict = Rating.to_dict
+
 class Settings(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    client_id = db.Column(db.Integer, db.ForeignKey('client.id'), nullable=False)
+    client_id = db.Column(db.Integer, db.ForeignKey('client.id'), nullable=False, index=True)
     red_min = db.Column(db.Integer, default=0)
     red_max = db.Column(db.Integer, default=40)
     orange_min = db.Column(db.Integer, default=41)
@@ -105,3 +160,49 @@ class Settings(db.Model):
                 'quarterly': self.frequency_quarterly
             }
         }
+
+class MemberRatingRollup(db.Model):
+    __tablename__ = 'member_rating_rollup'
+    __table_args__ = (db.UniqueConstraint('team_member_id', 'period', 'period_start'),)
+    id = db.Column(db.Integer, primary_key=True)
+    team_member_id = db.Column(db.Integer, db.ForeignKey('team_member.id'), nullable=False)
+    period = db.Column(db.String(20), nullable=False)  # weekly, bi_weekly, monthly, quarterly
+    period_start = db.Column(db.DateTime, nullable=False)
+    rating_count = db.Column(db.Integer, nullable=False, default=0)
+    sum_ability_to_impart_knowledge = db.Column(db.Integer, nullable=False, default=0)
+    sum_approachable = db.Column(db.Integer, nullable=False, default=0)
+    sum_necessary_skills = db.Column(db.Integer, nullable=False, default=0)
+    sum_trained = db.Column(db.Integer, nullable=False, default=0)
+    sum_absence = db.Column(db.Integer, nullable=False, default=0)
+    sum_self_motivation = db.Column(db.Integer, nullable=False, default=0)
+    sum_capacity_for_learning = db.Column(db.Integer, nullable=False, default=0)
+    sum_adaptability = db.Column(db.Integer, nullable=False, default=0)
+    sum_total_score = db.Column(db.Integer, nullable=False, default=0)
+    sum_avg_score = db.Column(db.Float, nullable=False, default=0)
+
+class TeamRatingRollup(db.Model):
+    __tablename__ = 'team_rating_rollup'
+    __table_args__ = (db.UniqueConstraint('team_id', 'period', 'period_start'),)
+    id = db.Column(db.Integer, primary_key=True)
+    team_id = db.Column(db.Integer, db.ForeignKey('team.id'), nullable=False)
+    period = db.Column(db.String(20), nullable=False)
+    period_start = db.Column(db.DateTime, nullable=False)
+    rating_count = db.Column(db.Integer, nullable=False, default=0)
+    sum_ability_to_impart_knowledge = db.Column(db.Integer, nullable=False, default=0)
+    sum_approachable = db.Column(db.Integer, nullable=False, default=0)
+    sum_necessary_skills = db.Column(db.Integer, nullable=False, default=0)
+    sum_trained = db.Column(db.Integer, nullable=False, default=0)
+    sum_absence = db.Column(db.Integer, nullable=False, default=0)
+    sum_self_motivation = db.Column(db.Integer, nullable=False, default=0)
+    sum_capacity_for_learning = db.Column(db.Integer, nullable=False, default=0)
+    sum_adaptability = db.Column(db.Integer, nullable=False, default=0)
+    sum_total_score = db.Column(db.Integer, nullable=False, default=0)
+    sum_avg_score = db.Column(db.Float, nullable=False, default=0)
+
+class StripeEvent(db.Model):
+    __tablename__ = 'stripe_event'
+    id = db.Column(db.String(255), primary_key=True)  # Stripe event id, so a redelivered event cannot be stored twice
+    type = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.Text, nullable=False)
+    received_at = db.Column(db.DateTime, default=datetime.utcnow)
+    processed_at = db.Column(db.DateTime, nullable=True)
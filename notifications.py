@@ -0,0 +1,144 @@
+import logging
+from datetime import datetime, timedelta
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import event, inspect, select, update, func, or_, bindparam
+from sqlalchemy.orm import Session
+from models import db, Client, User, Team, TeamMember, Rating, RatingArchive, Settings
+
+# Same order as the Settings.frequency_* flags; the first one set wins
+FREQUENCIES = (
+    ('frequency_weekly', relativedelta(weeks=1)),
+    ('frequency_bi_weekly', relativedelta(weeks=2)),
+    ('frequency_monthly', relativedelta(months=1)),
+    ('frequency_quarterly', relativedelta(months=3)),
+)
+DEFAULT_INTERVAL = relativedelta(months=1)
+
+REMINDERS = (
+    ('notify_1_week', timedelta(weeks=1)),
+    ('notify_3_days', timedelta(days=3)),
+    ('notify_1_day', timedelta(days=1)),
+)
+
+def rating_interval(settings):
+    if settings is None:
+        return DEFAULT_INTERVAL
+    for flag, interval in FREQUENCIES:
+        if getattr(settings, flag):
+            return interval
+    return DEFAULT_INTERVAL
+
+def _team_settings(session, team_ids):
+    rows = session.execute(
+        select(Team.id, Settings).outerjoin(Settings, Settings.client_id == Team.client_id).where(Team.id.in_(team_ids))
+    ).all()
+    return {team_id: settings for team_id, settings in rows}
+
+def advance_next_due(session, ratings):
+    # A new rating pushes its team's due date to one rating interval after it
+    latest = {}
+    for rating in ratings:
+        member_id = rating['team_member_id'] if isinstance(rating, dict) else rating.team_member_id
+        timestamp = (rating['timestamp'] if isinstance(rating, dict) else rating.timestamp) or datetime.utcnow()
+        latest[member_id] = max(latest.get(member_id, timestamp), timestamp)
+    if not latest:
+        return
+
+    with session.no_autoflush:
+        team_ids = dict(session.execute(
+            select(TeamMember.id, TeamMember.team_id).where(TeamMember.id.in_(latest))
+        ).all())
+        team_latest = {}
+        for member_id, timestamp in latest.items():
+            team_id = team_ids[member_id]
+            team_latest[team_id] = max(team_latest.get(team_id, timestamp), timestamp)
+        settings = _team_settings(session, list(team_latest))
+        params = [
+            {'team_id': team_id, 'due': timestamp + rating_interval(settings.get(team_id))}
+            for team_id, timestamp in team_latest.items()
+        ]
+        team = Team.__table__
+        session.execute(
+            update(team)
+            .where(team.c.id == bindparam('team_id'))
+            .where(or_(team.c.next_rating_due.is_(None), team.c.next_rating_due < bindparam('due')))
+            .values(next_rating_due=bindparam('due')),
+            params
+        )
+
+def refresh_next_due(session, client_id=None):
+    query = select(Team.id, func.max(Rating.timestamp)).outerjoin(
+        TeamMember, TeamMember.team_id == Team.id
+    ).outerjoin(Rating, Rating.team_member_id == TeamMember.id).group_by(Team.id)
+    if client_id is not None:
+        query = query.where(Team.client_id == client_id)
+    latest = dict(session.execute(query).all())
+    if not latest:
+        return 0
+
+    # A team whose ratings have all been archived is still due one interval after its last rating
+    archived = select(TeamMember.team_id, func.max(RatingArchive.timestamp)).join(
+        RatingArchive, RatingArchive.team_member_id == TeamMember.id
+    ).group_by(TeamMember.team_id)
+    if client_id is not None:
+        archived = archived.join(Team, TeamMember.team_id == Team.id).where(Team.client_id == client_id)
+    for team_id, timestamp in session.execute(archived).all():
+        if latest.get(team_id) is None:
+            latest[team_id] = timestamp
+
+    settings = _team_settings(session, list(latest))
+    # Teams that were never rated have no due date until their first rating
+    params = [
+        {'team_id': team_id, 'due': timestamp + rating_interval(settings.get(team_id)) if timestamp else None}
+        for team_id, timestamp in latest.items()
+    ]
+    team = Team.__table__
+    session.execute(
+        update(team).where(team.c.id == bindparam('team_id')).values(next_rating_due=bindparam('due')),
+        params
+    )
+    return len(params)
+
+def _after_flush(session, flush_context):
+    new_ratings = [obj for obj in session.new if isinstance(obj, Rating)]
+    if new_ratings:
+        advance_next_due(session, new_ratings)
+    # A changed rating frequency moves every due date of the client
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Settings) and any(
+            inspect(obj).attrs[flag].history.has_changes() for flag, _ in FREQUENCIES
+        ):
+            with session.no_autoflush:
+                refresh_next_due(session, obj.client_id)
+
+def init_notifications():
+    if not event.contains(Session, 'after_flush', _after_flush):
+        event.listen(Session, 'after_flush', _after_flush)
+
+def due_reminders(now=None, window=timedelta(hours=1)):
+    # Each tick picks the teams whose due date enters a reminder offset during the tick.
+    # With the tick interval equal to window, every team is selected once per enabled offset.
+    now = now or datetime.utcnow()
+    reminders = []
+    for flag, offset in REMINDERS:
+        start = now + offset
+        rows = db.session.execute(
+            select(Team.id, Team.name, Team.next_rating_due, func.coalesce(User.email, Client.email))
+            .join(Client, Team.client_id == Client.id)
+            .join(Settings, Settings.client_id == Team.client_id)
+            .outerjoin(User, Team.user_id == User.id)
+            .where(getattr(Settings, flag).is_(True))
+            .where(Team.next_rating_due >= start, Team.next_rating_due < start + window)
+        ).all()
+        reminders.extend(
+            {'team_id': team_id, 'team_name': name, 'due': due.isoformat(), 'recipient': email}
+            for team_id, name, due, email in rows
+        )
+    return reminders
+
+def send_due_reminders(celery, now=None, window=timedelta(hours=1), batch_size=50):
+    reminders = due_reminders(now, window)
+    for start in range(0, len(reminders), batch_size):
+        celery.send_task('tasks.send_rating_reminders', args=[reminders[start:start + batch_size]])
+    logging.info(f"Queued {len(reminders)} rating reminders")
+    return len(reminders)
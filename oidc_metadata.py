@@ -0,0 +1,85 @@
+import json
+import os
+import time
+import logging
+import threading
+import requests
+
+# Only the fields authlib needs to log users in without a discovery request
+METADATA_KEYS = (
+    'issuer', 'authorization_endpoint', 'token_endpoint', 'userinfo_endpoint', 'jwks_uri', 'jwks',
+    'end_session_endpoint', 'id_token_signing_alg_values_supported'
+)
+
+def fetch_oidc_metadata(domain):
+    response = requests.get(f'https://{domain}/.well-known/openid-configuration', timeout=5)
+    response.raise_for_status()
+    metadata = {key: value for key, value in response.json().items() if key in METADATA_KEYS}
+    if metadata.get('jwks_uri'):
+        jwks = requests.get(metadata['jwks_uri'], timeout=5)
+        jwks.raise_for_status()
+        metadata['jwks'] = jwks.json()
+    return metadata
+
+def refresh_oidc_metadata(domain, cache_path):
+    try:
+        metadata = fetch_oidc_metadata(domain)
+    except (requests.RequestException, ValueError) as e:
+        logging.warning(f"Could not refresh OIDC metadata for {domain}: {e}")
+        return None
+    # Write to a temporary file first so concurrent workers never read a partial file
+    temp_path = f'{cache_path}.{os.getpid()}.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(metadata, f)
+    os.replace(temp_path, cache_path)
+    return metadata
+
+# Failed refreshes are retried at most this often
+REFRESH_RETRY_SECONDS = 60
+
+class OIDCMetadataCache:
+    def __init__(self, domain, cache_path, max_age):
+        self.domain = domain
+        self.cache_path = cache_path
+        self.max_age = max_age
+        self.loaded_mtime = None
+        self.refresh_started = 0.0
+        self.lock = threading.Lock()
+
+    def _refresh_in_background(self):
+        with self.lock:
+            if time.monotonic() - self.refresh_started < REFRESH_RETRY_SECONDS:
+                return
+            self.refresh_started = time.monotonic()
+        threading.Thread(target=refresh_oidc_metadata, args=(self.domain, self.cache_path), daemon=True).start()
+
+    def load(self):
+        try:
+            mtime = os.path.getmtime(self.cache_path)
+            with open(self.cache_path) as f:
+                metadata = json.load(f)
+        except (OSError, ValueError):
+            # First boot: authlib discovers lazily this time, later requests pick up the cache
+            self._refresh_in_background()
+            return None
+
+        # A stale copy is still used; the refresh happens off the request path
+        if time.time() - mtime > self.max_age:
+            self._refresh_in_background()
+        self.loaded_mtime = mtime
+        return metadata
+
+    def apply(self, client):
+        # Called on use rather than only at boot: workers forked from a preloaded master
+        # would otherwise keep the master's copy until the dyno restarts
+        try:
+            mtime = os.path.getmtime(self.cache_path)
+        except OSError:
+            mtime = None
+        if mtime is None or time.time() - mtime > self.max_age:
+            self._refresh_in_background()
+        if mtime is None or mtime == self.loaded_mtime:
+            return
+        metadata = self.load()
+        if metadata:
+            client.server_metadata.update(metadata)
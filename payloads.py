@@ -0,0 +1,116 @@
+from datetime import datetime
+from typing import Optional
+import msgspec
+from models import RATING_CRITERIA
+
+# Typed JSON payloads for the history, analytics, team and settings endpoints. Structs are built
+# straight from query result rows, so the hot endpoints skip ORM instance hydration and intermediate dicts.
+
+class RatingPayload(msgspec.Struct):
+    id: int
+    team_member_id: int
+    timestamp: Optional[datetime]
+    ability_to_impart_knowledge: int
+    approachable: int
+    necessary_skills: int
+    trained: int
+    absence: int
+    self_motivation: int
+    capacity_for_learning: int
+    adaptability: int
+    total_score: int
+    avg_score: float
+    # None when the total falls outside every configured range
+    band: Optional[str] = None
+
+class TeamMemberPayload(msgspec.Struct):
+    id: int
+    first_name: str
+    surname: str
+    employer_id: str
+    team_id: int
+
+class TeamMemberHistoryPayload(msgspec.Struct):
+    id: int
+    first_name: str
+    surname: str
+    employer_id: str
+    ratings: list[RatingPayload]
+
+class TeamPayload(msgspec.Struct):
+    id: int
+    name: str
+    client_id: int
+    user_id: Optional[int]
+
+class ScoreRange(msgspec.Struct):
+    min: Optional[int]
+    max: Optional[int]
+
+# Same shape as Settings.to_dict()
+class SettingsPayload(msgspec.Struct):
+    score_ranges: dict[str, ScoreRange]
+    email_notifications: dict[str, Optional[bool]]
+    rating_frequency: dict[str, Optional[bool]]
+
+class MemberAnalyticsPayload(msgspec.Struct):
+    id: int
+    first_name: str
+    surname: str
+    employer_id: str
+    rating_count: int = 0
+    window_count: int = 0
+    avg_total_score: Optional[float] = None
+    percentile_rank: Optional[float] = None
+    trend_slope: Optional[float] = None
+    weakest_criterion: Optional[str] = None
+    criteria: Optional[dict[str, float]] = None
+
+# Column order of RatingPayload, for building select() lists and structs positionally
+RATING_FIELDS = ('id', 'team_member_id', 'timestamp') + RATING_CRITERIA + ('total_score', 'avg_score')
+TEAM_FIELDS = ('id', 'name', 'client_id', 'user_id')
+
+SCORE_BANDS = ('red', 'orange', 'white', 'green')
+NOTIFICATION_FIELDS = {'1_week': 'notify_1_week', '3_days': 'notify_3_days', '1_day': 'notify_1_day'}
+FREQUENCY_FIELDS = ('weekly', 'bi_weekly', 'monthly', 'quarterly')
+SETTINGS_FIELDS = tuple(f'{band}_{bound}' for band in SCORE_BANDS for bound in ('min', 'max')) + tuple(
+    NOTIFICATION_FIELDS.values()
+) + tuple(f'frequency_{name}' for name in FREQUENCY_FIELDS)
+
+encoder = msgspec.json.Encoder()
+
+def rating_columns(model):
+    return [getattr(model, name) for name in RATING_FIELDS]
+
+def rating_payloads(rows, bands=None):
+    if bands is None:
+        return [RatingPayload(*row) for row in rows]
+    return [RatingPayload(*row, band=band) for row, band in zip(rows, bands)]
+
+def team_columns(model):
+    return [getattr(model, name) for name in TEAM_FIELDS]
+
+def team_payloads(rows):
+    return [TeamPayload(*row) for row in rows]
+
+def settings_columns(model):
+    return [getattr(model, name) for name in SETTINGS_FIELDS]
+
+def settings_payload(row):
+    # Accepts a Settings instance or a row selected with settings_columns
+    return SettingsPayload(
+        score_ranges={
+            band: ScoreRange(getattr(row, f'{band}_min'), getattr(row, f'{band}_max')) for band in SCORE_BANDS
+        },
+        email_notifications={name: getattr(row, field) for name, field in NOTIFICATION_FIELDS.items()},
+        rating_frequency={name: getattr(row, f'frequency_{name}') for name in FREQUENCY_FIELDS}
+    )
+
+def columnar(rows, fields, **extra):
+    # Chart-friendly layout: one array per column instead of one object per row
+    columns = dict(zip(fields, map(list, zip(*rows)))) if rows else {name: [] for name in fields}
+    columns.update(extra)
+    return columns
+
+def encode(payload):
+    return encoder.encode(payload)
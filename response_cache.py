@@ -0,0 +1,206 @@
+import hashlib
+import logging
+import threading
+from functools import wraps
+from cachetools import TTLCache
+from flask import Response, make_response, request
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+from auth_utils import get_current_client_id
+from models import Team, TeamMember, Rating, Settings
+
+# Read-heavy tenant endpoints and the resource each one depends on. Keys are endpoint names
+# of views registered elsewhere; missing endpoints are skipped.
+CACHED_ENDPOINTS = {
+    'team_management.get_teams': 'teams',
+    'rate_team.get_team_members': 'team_members',
+    'setup.get_settings': 'settings',
+}
+
+class LocalResponseCache:
+    # Per process: with several workers, invalidations only reach the worker that made the write
+    errors = ()
+
+    def __init__(self, size, ttl):
+        self.entries = TTLCache(maxsize=size, ttl=ttl)
+        self.generations = {}
+        self.lock = threading.Lock()
+
+    def generation(self, client_id, resource):
+        with self.lock:
+            return self.generations.get((client_id, resource), 0)
+
+    def bump(self, client_id, resource):
+        with self.lock:
+            key = (client_id, resource)
+            self.generations[key] = self.generations.get(key, 0) + 1
+
+    def get(self, key):
+        with self.lock:
+            return self.entries.get(key)
+
+    def set(self, key, entry):
+        with self.lock:
+            self.entries[key] = entry
+
+class RedisResponseCache:
+    def __init__(self, client, ttl, prefix='response-cache:'):
+        import redis
+        # An unavailable cache only costs the caching, never the request
+        self.errors = (redis.RedisError, OSError)
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def _generation_key(self, client_id, resource):
+        return f'{self.prefix}gen:{client_id}:{resource}'
+
+    def generation(self, client_id, resource):
+        return int(self.client.get(self._generation_key(client_id, resource)) or 0)
+
+    def bump(self, client_id, resource):
+        self.client.incr(self._generation_key(client_id, resource))
+
+    def get(self, key):
+        entry = self.client.hgetall(self.prefix + key)
+        if not entry:
+            return None
+        return {'body': entry[b'body'], 'etag': entry[b'etag'].decode(), 'mimetype': entry[b'mimetype'].decode()}
+
+    def set(self, key, entry):
+        pipeline = self.client.pipeline()
+        pipeline.hset(self.prefix + key, mapping=entry)
+        pipeline.expire(self.prefix + key, self.ttl)
+        pipeline.execute()
+
+cache = None
+
+def invalidate(client_id, resource):
+    if cache is not None:
+        cache.bump(client_id, resource)
+
+def team_analytics_resource(team_id):
+    return f'team_analytics:{team_id}'
+
+def cached_response(resource):
+    # resource may be a callable taking the view arguments, for per-object resources
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if cache is None or request.method != 'GET':
+                return view(*args, **kwargs)
+            client_id = get_current_client_id()
+            if client_id is None:
+                return view(*args, **kwargs)
+
+            name = resource(*args, **kwargs) if callable(resource) else resource
+            # Writes bump the generation, so entries cached before a write are never served after it
+            try:
+                generation = cache.generation(client_id, name)
+                key = f'{client_id}:{name}:{generation}:{request.full_path}'
+                entry = cache.get(key)
+            except cache.errors as e:
+                logging.warning(f"Response cache unavailable, serving {request.path} uncached: {e}")
+                return view(*args, **kwargs)
+            if entry is None:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.direct_passthrough:
+                    return response
+                body = response.get_data()
+                entry = {'body': body, 'etag': hashlib.sha1(body).hexdigest(), 'mimetype': response.mimetype}
+                try:
+                    cache.set(key, entry)
+                except cache.errors as e:
+                    logging.warning(f"Response cache unavailable, serving {request.path} uncached: {e}")
+                    return response
+
+            if request.if_none_match.contains(entry['etag']):
+                response = Response(status=304)
+            else:
+                response = Response(entry['body'], mimetype=entry['mimetype'])
+            response.set_etag(entry['etag'])
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
+
+def _pending(session):
+    return session.info.setdefault('response_cache_invalidations', set())
+
+def invalidate_rated_teams(session, member_ids):
+    # New ratings change their team's analytics. Applied when the session commits.
+    if not member_ids:
+        return
+    rows = session.execute(
+        select(Team.client_id, Team.id).join(TeamMember, TeamMember.team_id == Team.id)
+        .where(TeamMember.id.in_(set(member_ids))).distinct()
+    ).all()
+    _pending(session).update((client_id, team_analytics_resource(team_id)) for client_id, team_id in rows)
+
+def _collect_invalidations(session, flush_context):
+    pending = _pending(session)
+    team_ids = set()
+    rated_member_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Team):
+            pending.add((obj.client_id, 'teams'))
+            pending.add((obj.client_id, 'team_members'))
+        elif isinstance(obj, TeamMember):
+            history = inspect(obj).attrs.team_id.history
+            team_ids.update(team_id for team_id in (obj.team_id, *history.deleted) if team_id is not None)
+        elif isinstance(obj, Rating):
+            rated_member_ids.add(obj.team_member_id)
+        elif isinstance(obj, Settings):
+            pending.add((obj.client_id, 'settings'))
+    if team_ids:
+        rows = session.execute(select(Team.client_id, Team.id).where(Team.id.in_(team_ids))).all()
+        for client_id, team_id in rows:
+            pending.add((client_id, 'team_members'))
+            pending.add((client_id, team_analytics_resource(team_id)))
+    invalidate_rated_teams(session, rated_member_ids)
+
+def _apply_invalidations(session):
+    pending = session.info.pop('response_cache_invalidations', None)
+    for client_id, resource in pending or ():
+        try:
+            invalidate(client_id, resource)
+        except Exception as e:
+            # The write is already committed, so the error is only logged; missed invalidations
+            # expire with the TTL. The rest are skipped rather than each waiting on a dead cache.
+            logging.warning(f"Could not invalidate {len(pending)} cached resources after commit: {e}")
+            break
+
+def _discard_invalidations(session, *args):
+    session.info.pop('response_cache_invalidations', None)
+
+def init_response_cache(app):
+    global cache
+    cache_type = app.config['RESPONSE_CACHE_TYPE']
+    if cache_type == 'none':
+        cache = None
+        return
+    if cache_type == 'redis':
+        import redis
+        # Short timeouts, so an unreachable Redis does not hold up requests while it is skipped
+        timeout = app.config['RESPONSE_CACHE_REDIS_TIMEOUT']
+        client = redis.from_url(app.config['RESPONSE_CACHE_REDIS_URL'], socket_timeout=timeout,
+                                socket_connect_timeout=timeout)
+        cache = RedisResponseCache(client, app.config['RESPONSE_CACHE_TTL'])
+    elif cache_type == 'simple':
+        if app.config['WEB_CONCURRENCY'] > 1:
+            raise ValueError('RESPONSE_CACHE_TYPE=simple cannot invalidate across several workers; '
+                             'use redis or none when WEB_CONCURRENCY > 1')
+        cache = LocalResponseCache(app.config['RESPONSE_CACHE_SIZE'], app.config['RESPONSE_CACHE_TTL'])
+    else:
+        raise ValueError(f'Unsupported RESPONSE_CACHE_TYPE: {cache_type}')
+
+    for endpoint, resource in CACHED_ENDPOINTS.items():
+        view = app.view_functions.get(endpoint)
+        if view is not None:
+            app.view_functions[endpoint] = cached_response(resource)(view)
+
+    # Invalidate only once the write is committed, so a rolled back write keeps the cache
+    if not event.contains(Session, 'after_flush', _collect_invalidations):
+        event.listen(Session, 'after_flush', _collect_invalidations)
+        event.listen(Session, 'after_commit', _apply_invalidations)
+        event.listen(Session, 'after_rollback', _discard_invalidations)
@@ -0,0 +1,192 @@
+from datetime import datetime, timedelta
+import logging
+from sqlalchemy import event, select, delete, func
+from sqlalchemy.orm import Session
+from models import db, Rating, RatingArchive, TeamMember, Team, MemberRatingRollup, TeamRatingRollup, RATING_CRITERIA
+
+# Same options as the Settings.frequency_* flags
+PERIODS = ('weekly', 'bi_weekly', 'monthly', 'quarterly')
+
+SUM_COLUMNS = tuple(f'sum_{name}' for name in RATING_CRITERIA) + ('sum_total_score', 'sum_avg_score')
+
+UPSERT_CHUNK_SIZE = 500
+
+# Fortnights are counted from a fixed Monday so every member and team shares the same boundaries
+BI_WEEKLY_ANCHOR = datetime(1970, 1, 5)
+
+def period_start(timestamp, period):
+    day = datetime(timestamp.year, timestamp.month, timestamp.day)
+    if period == 'weekly':
+        return day - timedelta(days=day.weekday())
+    if period == 'bi_weekly':
+        days = (day - BI_WEEKLY_ANCHOR).days
+        return BI_WEEKLY_ANCHOR + timedelta(days=days - days % 14)
+    if period == 'monthly':
+        return datetime(day.year, day.month, 1)
+    if period == 'quarterly':
+        return datetime(day.year, 3 * ((day.month - 1) // 3) + 1, 1)
+    raise ValueError(f'Unknown period: {period}')
+
+def _rating_values(rating):
+    if isinstance(rating, dict):
+        return rating
+    values = {name: getattr(rating, name) for name in RATING_CRITERIA}
+    values['team_member_id'] = rating.team_member_id
+    values['timestamp'] = rating.timestamp
+    values['total_score'] = rating.total_score
+    values['avg_score'] = rating.avg_score
+    return values
+
+def _accumulate(buckets, key, values):
+    bucket = buckets.get(key)
+    if bucket is None:
+        bucket = buckets[key] = dict.fromkeys(SUM_COLUMNS, 0)
+        bucket['rating_count'] = 0
+    bucket['rating_count'] += 1
+    for name in RATING_CRITERIA:
+        bucket[f'sum_{name}'] += values[name]
+    bucket['sum_total_score'] += values['total_score']
+    bucket['sum_avg_score'] += values['avg_score']
+
+def aggregate(ratings, team_ids):
+    member_buckets = {}
+    team_buckets = {}
+    for rating in ratings:
+        values = _rating_values(rating)
+        member_id = values['team_member_id']
+        team_id = team_ids[member_id]
+        timestamp = values['timestamp'] or datetime.utcnow()
+        for period in PERIODS:
+            start = period_start(timestamp, period)
+            _accumulate(member_buckets, (member_id, period, start), values)
+            _accumulate(team_buckets, (team_id, period, start), values)
+    return member_buckets, team_buckets
+
+def _upsert(session, model, owner_column, buckets):
+    if not buckets:
+        return
+    table = model.__table__
+    rows = [
+        dict(bucket, **{owner_column: owner_id, 'period': period, 'period_start': start})
+        for (owner_id, period, start), bucket in buckets.items()
+    ]
+    dialect = session.get_bind(mapper=model).dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise RuntimeError(f'Rating rollups are not supported on {dialect}')
+
+    # Increment in the database so concurrent submits never lose an update. Rows go in chunks
+    # to stay under the bound parameter limit when a full rebuild upserts every bucket.
+    for chunk_start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        stmt = insert(table).values(rows[chunk_start:chunk_start + UPSERT_CHUNK_SIZE])
+        increments = {name: table.c[name] + stmt.excluded[name] for name in SUM_COLUMNS + ('rating_count',)}
+        stmt = stmt.on_conflict_do_update(index_elements=[owner_column, 'period', 'period_start'], set_=increments)
+        session.execute(stmt)
+
+def apply_ratings(session, ratings):
+    ratings = [_rating_values(rating) for rating in ratings]
+    if not ratings:
+        return
+    member_ids = {rating['team_member_id'] for rating in ratings}
+    with session.no_autoflush:
+        team_ids = dict(session.execute(
+            select(TeamMember.id, TeamMember.team_id).where(TeamMember.id.in_(member_ids))
+        ).all())
+        member_buckets, team_buckets = aggregate(ratings, team_ids)
+        _upsert(session, MemberRatingRollup, 'team_member_id', member_buckets)
+        _upsert(session, TeamRatingRollup, 'team_id', team_buckets)
+
+def _after_flush(session, flush_context):
+    new_ratings = [obj for obj in session.new if isinstance(obj, Rating)]
+    if new_ratings:
+        apply_ratings(session, new_ratings)
+
+def init_rollups():
+    # Runs inside the flush that inserts the Rating, so rollups commit or roll back with it
+    if not event.contains(Session, 'after_flush', _after_flush):
+        event.listen(Session, 'after_flush', _after_flush)
+
+def _iter_ratings(member_ids, batch_size):
+    # Archived ratings still count towards their periods
+    for model in (Rating, RatingArchive):
+        columns = [model.team_member_id, model.timestamp, model.total_score, model.avg_score]
+        columns += [getattr(model, name) for name in RATING_CRITERIA]
+        yield from db.session.execute(
+            select(*columns).where(model.team_member_id.in_(member_ids)).execution_options(yield_per=batch_size)
+        ).mappings()
+
+def rollup_gaps(team_ids):
+    # Teams whose rollups do not count every rating, e.g. ratings saved before rollups existed
+    counts = dict.fromkeys(team_ids, 0)
+    if not counts:
+        return []
+    for model in (Rating, RatingArchive):
+        rows = db.session.execute(
+            select(TeamMember.team_id, func.count(model.id))
+            .join(TeamMember, model.team_member_id == TeamMember.id)
+            .where(TeamMember.team_id.in_(counts)).group_by(TeamMember.team_id)
+        ).all()
+        for team_id, count in rows:
+            counts[team_id] += count
+    # Every rating lands in exactly one week, so the weekly buckets add up to the rating count
+    covered = dict(db.session.execute(
+        select(TeamRatingRollup.team_id, func.sum(TeamRatingRollup.rating_count))
+        .where(TeamRatingRollup.team_id.in_(counts), TeamRatingRollup.period == 'weekly')
+        .group_by(TeamRatingRollup.team_id)
+    ).all())
+    return [team_id for team_id, count in counts.items() if (covered.get(team_id) or 0) != count]
+
+def rebuild_rollups(client_id=None, batch_size=1000, team_ids=None):
+    member_query = select(TeamMember.id, TeamMember.team_id)
+    if client_id is not None:
+        member_query = member_query.join(Team, TeamMember.team_id == Team.id).where(Team.client_id == client_id)
+    if team_ids is not None:
+        member_query = member_query.where(TeamMember.team_id.in_(team_ids))
+    team_ids = dict(db.session.execute(member_query).all())
+    if not team_ids:
+        return 0
+
+    member_ids = list(team_ids)
+    team_id_list = list(set(team_ids.values()))
+    db.session.execute(delete(MemberRatingRollup).where(MemberRatingRollup.team_member_id.in_(member_ids)))
+    db.session.execute(delete(TeamRatingRollup).where(TeamRatingRollup.team_id.in_(team_id_list)))
+
+    member_buckets, team_buckets = aggregate(_iter_ratings(member_ids, batch_size), team_ids)
+    _upsert(db.session, MemberRatingRollup, 'team_member_id', member_buckets)
+    _upsert(db.session, TeamRatingRollup, 'team_id', team_buckets)
+    db.session.commit()
+    logging.info(f"Rebuilt {len(member_buckets)} member and {len(team_buckets)} team rollups")
+    return len(member_buckets) + len(team_buckets)
+
+def rollup_to_dict(rollup):
+    count = rollup.rating_count or 1
+    data = {
+        'period': rollup.period,
+        'period_start': rollup.period_start.isoformat(),
+        'rating_count': rollup.rating_count,
+        'avg_total_score': rollup.sum_total_score / count,
+        'avg_score': rollup.sum_avg_score / count
+    }
+    for name in RATING_CRITERIA:
+        data[name] = getattr(rollup, f'sum_{name}') / count
+    return data
+
+def get_team_rollups(team_id, period, start=None):
+    query = TeamRatingRollup.query.filter_by(team_id=team_id, period=period)
+    if start is not None:
+        query = query.filter(TeamRatingRollup.period_start >= start)
+    return [rollup_to_dict(r) for r in query.order_by(TeamRatingRollup.period_start).all()]
+
+def get_member_rollups(team_id, period, start=None):
+    query = db.session.query(MemberRatingRollup).join(
+        TeamMember, MemberRatingRollup.team_member_id == TeamMember.id
+    ).filter(TeamMember.team_id == team_id, MemberRatingRollup.period == period)
+    if start is not None:
+        query = query.filter(MemberRatingRollup.period_start >= start)
+    members = {}
+    for rollup in query.order_by(MemberRatingRollup.team_member_id, MemberRatingRollup.period_start).all():
+        members.setdefault(rollup.team_member_id, []).append(rollup_to_dict(rollup))
+    return members
@@ -0,0 +1,33 @@
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from auth_utils import login_required, get_current_user
+from export import EXPORT_FORMATS, export_ratings
+from routes.team_history import parse_timestamp
+
+export_bp = Blueprint('export', __name__)
+
+MIMETYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+@export_bp.route('/ratings', methods=['GET'])
+@login_required
+def export_client_ratings():
+    user = get_current_user()
+    if user is None or not user.is_admin:
+        return jsonify({'error': 'Only administrators can export ratings'}), 403
+
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f'format must be one of {", ".join(EXPORT_FORMATS)}'}), 400
+    try:
+        since = parse_timestamp(request.args.get('since'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    filename = f'ratings.{export_format}'
+    return Response(
+        stream_with_context(export_ratings(user.client_id, export_format, since)),
+        mimetype=MIMETYPES[export_format],
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
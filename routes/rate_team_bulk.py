@@ -0,0 +1,103 @@
+from datetime import datetime
+from flask import Blueprint, jsonify, request
+from sqlalchemy import insert
+from auth_utils import login_required, get_current_user
+from models import db, Team, TeamMember, Rating, Settings, RATING_CRITERIA
+from rollups import apply_ratings
+from notifications import advance_next_due
+from response_cache import invalidate_rated_teams
+
+rate_team_bulk_bp = Blueprint('rate_team_bulk', __name__)
+
+MAX_BULK_RATINGS = 1000
+
+def validate_ratings(entries, member_ids):
+    from scoring import CRITERION_MIN, CRITERION_MAX
+
+    errors = []
+    seen = set()
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            errors.append({'index': index, 'error': 'Rating must be an object'})
+            continue
+        member_id = entry.get('team_member_id')
+        if isinstance(member_id, bool) or not isinstance(member_id, int) or member_id not in member_ids:
+            errors.append({'index': index, 'error': f'Team member {member_id} is not in this team'})
+        elif member_id in seen:
+            errors.append({'index': index, 'error': f'Team member {member_id} is rated more than once'})
+        else:
+            seen.add(member_id)
+        for name in RATING_CRITERIA:
+            value = entry.get(name)
+            if isinstance(value, bool) or not isinstance(value, int) or not CRITERION_MIN <= value <= CRITERION_MAX:
+                errors.append({
+                    'index': index,
+                    'error': f'{name} must be an integer from {CRITERION_MIN} to {CRITERION_MAX}'
+                })
+    return errors
+
+@rate_team_bulk_bp.route('/submit_team_ratings/<int:team_id>', methods=['POST'])
+@login_required
+def submit_team_ratings(team_id):
+    from scoring import score_batch, band_names
+
+    user = get_current_user()
+    team = Team.query.filter_by(id=team_id, client_id=user.client_id).first() if user else None
+    if team is None:
+        return jsonify({'error': 'Team not found'}), 404
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    entries = data.get('ratings')
+    if not isinstance(entries, list) or not entries:
+        return jsonify({'error': 'ratings must be a non-empty list'}), 400
+    if len(entries) > MAX_BULK_RATINGS:
+        return jsonify({'error': f'At most {MAX_BULK_RATINGS} ratings can be submitted at once'}), 400
+
+    # The whole payload is validated before anything is written
+    member_ids = {member_id for member_id, in db.session.query(TeamMember.id).filter_by(team_id=team.id)}
+    errors = validate_ratings(entries, member_ids)
+    if errors:
+        return jsonify({'errors': errors}), 400
+
+    settings = Settings.query.filter_by(client_id=team.client_id).first()
+    scores = score_batch(entries, settings)
+    timestamp = datetime.utcnow()
+    rows = []
+    for index, entry in enumerate(entries):
+        row = {name: entry[name] for name in RATING_CRITERIA}
+        row.update({
+            'team_member_id': entry['team_member_id'],
+            'timestamp': timestamp,
+            'total_score': int(scores['total_score'][index]),
+            'avg_score': float(scores['avg_score'][index])
+        })
+        rows.append(row)
+
+    # One multi-row INSERT; bulk inserts bypass the flush, so rollups, due dates and
+    # cached analytics are updated explicitly
+    rating_ids = db.session.scalars(
+        insert(Rating).returning(Rating.id, sort_by_parameter_order=True), rows
+    ).all()
+    apply_ratings(db.session, rows)
+    advance_next_due(db.session, rows)
+    invalidate_rated_teams(db.session, [row['team_member_id'] for row in rows])
+    db.session.commit()
+
+    bands = band_names(scores['band'])
+    return jsonify({
+        'team_id': team.id,
+        'timestamp': timestamp.isoformat(),
+        'ratings': [
+            {
+                'id': rating_id,
+                'team_member_id': row['team_member_id'],
+                'total_score': row['total_score'],
+                'avg_score': row['avg_score'],
+                'band': band
+            }
+            for rating_id, row, band in zip(rating_ids, rows, bands)
+        ],
+        'band_counts': scores['band_counts']
+    }), 201
@@ -0,0 +1,32 @@
+from flask import Blueprint, Response, jsonify, request
+from auth_utils import login_required, get_current_user
+from models import Team
+from response_cache import cached_response, team_analytics_resource
+
+team_analytics_bp = Blueprint('team_analytics', __name__)
+
+@team_analytics_bp.route('/get_team_analytics/<int:team_id>', methods=['GET'])
+@login_required
+@cached_response(team_analytics_resource)
+def get_team_analytics(team_id):
+    # NumPy is imported on first use rather than at boot
+    from analytics import DEFAULT_TREND_WINDOW, MAX_TREND_WINDOW, team_analytics
+    from payloads import encode
+
+    user = get_current_user()
+    team = Team.query.filter_by(id=team_id, client_id=user.client_id).first() if user else None
+    if team is None:
+        return jsonify({'error': 'Team not found'}), 404
+
+    try:
+        window = int(request.args.get('last_n', DEFAULT_TREND_WINDOW))
+    except ValueError:
+        return jsonify({'error': 'last_n must be an integer'}), 400
+    if not 2 <= window <= MAX_TREND_WINDOW:
+        return jsonify({'error': f'last_n must be from 2 to {MAX_TREND_WINDOW}'}), 400
+
+    return Response(encode({
+        'team_id': team.id,
+        'last_n': window,
+        'members': team_analytics(team.id, window)
+    }), mimetype='application/json')
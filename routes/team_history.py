@@ -0,0 +1,212 @@
+import base64
+import binascii
+from datetime import datetime, timezone
+from sqlalchemy import tuple_
+from flask import Blueprint, Response, jsonify, request
+from auth_utils import login_required, get_current_user
+from models import db, Team, TeamMember, Rating, RatingArchive, Settings
+from archive import reaches_archive
+from rollups import PERIODS, get_team_rollups, get_member_rollups
+from payloads import (
+    RATING_FIELDS, TeamMemberPayload, TeamMemberHistoryPayload, rating_columns, rating_payloads, columnar, encode
+)
+
+team_history_bp = Blueprint('team_history', __name__)
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+
+RESPONSE_FORMATS = ('rows', 'columnar')
+
+def parse_timestamp(value):
+    if not value:
+        return None
+    timestamp = datetime.fromisoformat(value)
+    # Ratings are stored as naive UTC, so offsets are converted rather than compared as is
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+def parse_limit(value):
+    if not value:
+        return DEFAULT_PAGE_SIZE
+    limit = int(value)
+    if limit < 1:
+        raise ValueError('limit must be positive')
+    return min(limit, MAX_PAGE_SIZE)
+
+def parse_format(value):
+    if not value:
+        return 'rows'
+    if value not in RESPONSE_FORMATS:
+        raise ValueError(f'format must be one of {", ".join(RESPONSE_FORMATS)}')
+    return value
+
+def json_response(payload):
+    return Response(encode(payload), mimetype='application/json')
+
+def encode_cursor(rating):
+    raw = f'{rating.timestamp.isoformat()}|{rating.id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(value):
+    if not value:
+        return None
+    try:
+        timestamp, rating_id = base64.urlsafe_b64decode(value.encode()).decode().split('|')
+        return parse_timestamp(timestamp), int(rating_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError('Invalid cursor')
+
+def _page(query, model, start, end, cursor, limit):
+    if start is not None:
+        query = query.filter(model.timestamp >= start)
+    if end is not None:
+        query = query.filter(model.timestamp < end)
+    if cursor is not None:
+        query = query.filter(tuple_(model.timestamp, model.id) < tuple_(*cursor))
+    return query.order_by(model.timestamp.desc(), model.id.desc()).limit(limit).all()
+
+def fetch_page(build_query, start, end, cursor, limit):
+    # Keyset pagination on (timestamp, id): every page is an index range scan,
+    # however deep into the history it is. Fetch one extra row to know whether another page exists.
+    rows = _page(build_query(Rating), Rating, start, end, cursor, limit + 1)
+    # Archived ratings are older than all hot ones, so the archive is only read once the hot rows run out
+    if len(rows) <= limit and reaches_archive(start):
+        rows += _page(build_query(RatingArchive), RatingArchive, start, end, cursor, limit + 1 - len(rows))
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1])
+
+def get_team_for_current_user(team_id):
+    user = get_current_user()
+    if user is None:
+        return None
+    return Team.query.filter_by(id=team_id, client_id=user.client_id).first()
+
+@team_history_bp.route('/get_team_history/<int:team_id>', methods=['GET'])
+@login_required
+def get_team_history(team_id):
+    team = get_team_for_current_user(team_id)
+    if team is None:
+        return jsonify({'error': 'Team not found'}), 404
+
+    try:
+        start = parse_timestamp(request.args.get('start'))
+        end = parse_timestamp(request.args.get('end'))
+        limit = parse_limit(request.args.get('limit'))
+        cursor = decode_cursor(request.args.get('cursor'))
+        response_format = parse_format(request.args.get('format'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # One query for the whole team instead of one request per member. Plain columns
+    # rather than entities, so no ORM instances are built for the page.
+    def build_query(model):
+        return db.session.query(
+            *rating_columns(model), TeamMember.first_name, TeamMember.surname, TeamMember.employer_id
+        ).join(TeamMember, model.team_member_id == TeamMember.id).filter(TeamMember.team_id == team.id)
+    rows, next_cursor = fetch_page(build_query, start, end, cursor, limit)
+
+    # NumPy is imported on first use rather than at boot
+    from scoring import classify, count_bands, band_names
+    settings = Settings.query.filter_by(client_id=team.client_id).first()
+    bands = classify([row.total_score for row in rows], settings)
+    names = band_names(bands)
+
+    width = len(RATING_FIELDS)
+    ratings = [row[:width] for row in rows]
+    members = {}
+    for row in rows:
+        if row.team_member_id not in members:
+            members[row.team_member_id] = (row.first_name, row.surname, row.employer_id)
+
+    if response_format == 'columnar':
+        return json_response({
+            'team_id': team.id,
+            'columns': columnar(ratings, RATING_FIELDS, band=names),
+            'members': [
+                TeamMemberPayload(member_id, *details, team.id) for member_id, details in members.items()
+            ],
+            'band_counts': count_bands(bands),
+            'next_cursor': next_cursor
+        })
+
+    grouped = {
+        member_id: TeamMemberHistoryPayload(member_id, *details, [])
+        for member_id, details in members.items()
+    }
+    for payload in rating_payloads(ratings, names):
+        grouped[payload.team_member_id].ratings.append(payload)
+
+    return json_response({
+        'team_id': team.id,
+        'members': list(grouped.values()),
+        'band_counts': count_bands(bands),
+        'next_cursor': next_cursor
+    })
+
+@team_history_bp.route('/get_member_history/<int:member_id>', methods=['GET'])
+@login_required
+def get_member_history(member_id):
+    user = get_current_user()
+    member = db.session.query(TeamMember).join(Team, TeamMember.team_id == Team.id).filter(
+        TeamMember.id == member_id, Team.client_id == user.client_id
+    ).first() if user else None
+    if member is None:
+        return jsonify({'error': 'Team member not found'}), 404
+
+    try:
+        start = parse_timestamp(request.args.get('start'))
+        end = parse_timestamp(request.args.get('end'))
+        limit = parse_limit(request.args.get('limit'))
+        cursor = decode_cursor(request.args.get('cursor'))
+        response_format = parse_format(request.args.get('format'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Served straight from ix_rating_member_timestamp_id (and its archive twin)
+    def build_query(model):
+        return db.session.query(*rating_columns(model)).filter(model.team_member_id == member.id)
+    rows, next_cursor = fetch_page(build_query, start, end, cursor, limit)
+
+    # Same row shape as the team history, band included
+    from scoring import classify, band_names
+    settings = Settings.query.filter_by(client_id=user.client_id).first()
+    names = band_names(classify([row.total_score for row in rows], settings))
+
+    if response_format == 'columnar':
+        return json_response({
+            'team_member_id': member.id,
+            'columns': columnar(rows, RATING_FIELDS, band=names),
+            'next_cursor': next_cursor
+        })
+
+    return json_response({
+        'team_member_id': member.id,
+        'ratings': rating_payloads(rows, names),
+        'next_cursor': next_cursor
+    })
+
+@team_history_bp.route('/get_team_rollups/<int:team_id>', methods=['GET'])
+@login_required
+def get_team_rollup_history(team_id):
+    team = get_team_for_current_user(team_id)
+    if team is None:
+        return jsonify({'error': 'Team not found'}), 404
+
+    period = request.args.get('period', 'monthly')
+    if period not in PERIODS:
+        return jsonify({'error': f'period must be one of {", ".join(PERIODS)}'}), 400
+    try:
+        start = parse_timestamp(request.args.get('start'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({
+        'team_id': team.id,
+        'period': period,
+        'team': get_team_rollups(team.id, period, start),
+        'members': get_member_rollups(team.id, period, start)
+    })
@@ -1,54 +1,125 @@
 from apscheduler.schedulers.background import BackgroundScheduler
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import select, update
 from models import db, Client, User
+from auth0_client import get_auth0_client
+from notifications import send_due_reminders
+from archive import archive_ratings
+from celery_app import get_celery
+from datetime import timedelta
 import requests
 import os
 import logging
 
+AUTH0_SYNC_WORKERS = int(os.getenv('AUTH0_SYNC_WORKERS', 8))
+
+def push_blocked_state(auth0, email, auth0_id, blocked):
+    # Runs on worker threads, so the database lookup is skipped; auth0_id comes from the query
+    user_id = auth0.resolve_user_id(email, auth0_id, lookup_db=False)
+    if user_id is None or not auth0.set_blocked(user_id, blocked):
+        return None
+    return user_id
+
+def reconcile_blocked_users(auth0=None, max_workers=AUTH0_SYNC_WORKERS, batch_size=500):
+    auth0 = auth0 or get_auth0_client()
+
+    # One streamed query for every user and their client's status
+    rows = db.session.execute(
+        select(User.id, User.email, User.auth0_id, User.auth0_blocked, Client.payment_status)
+        .join(Client, User.client_id == Client.id)
+        .execution_options(yield_per=batch_size)
+    )
+
+    processed = 0
+    changes = []
+    for row in rows:
+        processed += 1
+        blocked = row.payment_status == 'blocked'
+        if row.auth0_blocked != blocked:
+            changes.append((row.id, row.email, row.auth0_id, blocked))
+
+    pushed = {True: [], False: []}
+    resolved_ids = {}
+    failed = 0
+    if changes:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                (user_id, auth0_id, blocked, executor.submit(push_blocked_state, auth0, email, auth0_id, blocked))
+                for user_id, email, auth0_id, blocked in changes
+            ]
+            for user_id, auth0_id, blocked, future in futures:
+                try:
+                    resolved = future.result()
+                except requests.RequestException as e:
+                    logging.warning(f"Auth0 request failed for user {user_id}: {e}")
+                    resolved = None
+                if resolved is None:
+                    failed += 1
+                    continue
+                pushed[blocked].append(user_id)
+                if not auth0_id:
+                    resolved_ids[user_id] = resolved
+
+    # Only record states Auth0 accepted, so failures are retried on the next run
+    for blocked, user_ids in pushed.items():
+        if user_ids:
+            db.session.execute(update(User).where(User.id.in_(user_ids)).values(auth0_blocked=blocked))
+    # Remember looked-up ids so later calls skip users-by-email
+    for user_id, auth0_id in resolved_ids.items():
+        db.session.execute(update(User).where(User.id == user_id).values(auth0_id=auth0_id))
+    db.session.commit()
+
+    report = {
+        'processed': processed,
+        'skipped': processed - len(changes),
+        'blocked': len(pushed[True]),
+        'unblocked': len(pushed[False]),
+        'failed': failed
+    }
+    logging.info(f"Auth0 block reconciliation: {report}")
+    return report
+
 def check_and_block_users():
     logging.info("Checking and blocking users based on client status...")
-    clients = Client.query.all()
-    for client in clients:
-        if client.payment_status == 'blocked':
-            users = User.query.filter_by(client_id=client.id).all()
-            for user in users:
-                block_user_in_auth0(user.email)
-        else:
-            users = User.query.filter_by(client_id=client.id).all()
-            for user in users:
-                unblock_user_in_auth0(user.email)
+    return reconcile_blocked_users()
 
 def block_user_in_auth0(email):
-    auth0_domain = os.getenv('AUTH0_DOMAIN')
-    auth0_token = os.getenv('AUTH0_API_TOKEN')
-    headers = {
-        'Authorization': f'Bearer {auth0_token}',
-        'Content-Type': 'application/json'
-    }
-    response = requests.get(f'https://{auth0_domain}/api/v2/users-by-email?email={email}', headers=headers)
-    if response.status_code == 200:
-        user_id = response.json()[0]['user_id']
-        block_payload = {
-            'blocked': True
-        }
-        requests.patch(f'https://{auth0_domain}/api/v2/users/{user_id}', headers=headers, json=block_payload)
+    auth0 = get_auth0_client()
+    user_id = auth0.resolve_user_id(email)
+    return user_id is not None and auth0.set_blocked(user_id, True)
 
 def unblock_user_in_auth0(email):
-    auth0_domain = os.getenv('AUTH0_DOMAIN')
-    auth0_token = os.getenv('AUTH0_API_TOKEN')
-    headers = {
-        'Authorization': f'Bearer {auth0_token}',
-        'Content-Type': 'application/json'
-    }
-    response = requests.get(f'https://{auth0_domain}/api/v2/users-by-email?email={email}', headers=headers)
-    if response.status_code == 200:
-        user_id = response.json()[0]['user_id']
-        unblock_payload = {
-            'blocked': False
-        }
-        requests.patch(f'https://{auth0_domain}/api/v2/users/{user_id}', headers=headers, json=unblock_payload)
-
-def start_scheduler():
+    auth0 = get_auth0_client()
+    user_id = auth0.resolve_user_id(email)
+    return user_id is not None and auth0.set_blocked(user_id, False)
+
+def start_scheduler(app=None):
+    def run_job():
+        if app is None:
+            return check_and_block_users()
+        with app.app_context():
+            return check_and_block_users()
+
     scheduler = BackgroundScheduler()
-    scheduler.add_job(func=check_and_block_users, trigger="interval", minutes=60)  # Adjust interval as needed
+    scheduler.add_job(func=run_job, trigger="interval", minutes=60, max_instances=1, coalesce=True)  # Adjust interval as needed
+
+    if app is not None:
+        # The reminder window must match the tick so every due date is picked up exactly once
+        tick = timedelta(minutes=app.config['REMINDER_TICK_MINUTES'])
+
+        def run_reminders():
+            with app.app_context():
+                return send_due_reminders(get_celery(app), window=tick, batch_size=app.config['REMINDER_BATCH_SIZE'])
+
+        scheduler.add_job(func=run_reminders, trigger="interval", seconds=tick.total_seconds(), max_instances=1)
+
+        if app.config['ARCHIVE_AFTER_DAYS']:
+            def run_archive():
+                with app.app_context():
+                    return archive_ratings(app.config['ARCHIVE_AFTER_DAYS'])
+
+            scheduler.add_job(func=run_archive, trigger="interval", days=1, max_instances=1, coalesce=True)
+
     scheduler.start()
     logging.info("Scheduler started...")
+    return scheduler
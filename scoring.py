@@ -0,0 +1,99 @@
+import numpy as np
+from models import Settings, RATING_CRITERIA
+
+BANDS = ('red', 'orange', 'white', 'green')
+
+# Allowed value of each individual criterion
+CRITERION_MIN = 0
+CRITERION_MAX = 10
+# Highest possible total; thresholds above it cannot match anything
+MAX_TOTAL = CRITERION_MAX * len(RATING_CRITERIA)
+
+# Thresholds used when a client has not saved any Settings yet
+DEFAULT_THRESHOLDS = tuple(
+    (Settings.__table__.c[f'{band}_min'].default.arg, Settings.__table__.c[f'{band}_max'].default.arg)
+    for band in BANDS
+)
+
+# client_id -> (thresholds, lookup table)
+_compiled_bands = {}
+
+def band_thresholds(settings):
+    if settings is None:
+        return DEFAULT_THRESHOLDS
+    # Every threshold column is nullable; an unset one falls back to its column default
+    thresholds = []
+    for band, (default_low, default_high) in zip(BANDS, DEFAULT_THRESHOLDS):
+        low = getattr(settings, f'{band}_min')
+        high = getattr(settings, f'{band}_max')
+        thresholds.append((default_low if low is None else low, default_high if high is None else high))
+    return tuple(thresholds)
+
+def _build_lookup(thresholds):
+    # Totals are small non-negative integers, so a table indexed by total
+    # turns classification into a single gather. -1 means "no band".
+    # The table never grows past the highest possible total, whatever the thresholds say.
+    highest = min(max(high for _, high in thresholds), MAX_TOTAL)
+    lookup = np.full(max(highest + 1, 0), -1, dtype=np.int8)
+    # Fill in reverse so the first matching band wins where ranges overlap
+    for index in range(len(thresholds) - 1, -1, -1):
+        low, high = thresholds[index]
+        lookup[max(low, 0):max(high + 1, 0)] = index
+    lookup.setflags(write=False)
+    return lookup
+
+def compile_bands(settings):
+    thresholds = band_thresholds(settings)
+    if settings is None or settings.client_id is None:
+        return _build_lookup(thresholds)
+    cached = _compiled_bands.get(settings.client_id)
+    # Comparing the thresholds picks up edits to Settings without explicit invalidation
+    if cached is not None and cached[0] == thresholds:
+        return cached[1]
+    lookup = _build_lookup(thresholds)
+    _compiled_bands[settings.client_id] = (thresholds, lookup)
+    return lookup
+
+def classify(totals, settings):
+    lookup = compile_bands(settings)
+    totals = np.asarray(totals, dtype=np.int64)
+    in_range = (totals >= 0) & (totals < lookup.size)
+    bands = np.full(totals.shape, -1, dtype=np.int8)
+    bands[in_range] = lookup[totals[in_range]]
+    return bands
+
+def count_bands(bands):
+    counts = np.bincount(bands[bands >= 0], minlength=len(BANDS))
+    return {band: int(counts[index]) for index, band in enumerate(BANDS)}
+
+def band_names(bands):
+    return [BANDS[index] if index >= 0 else None for index in bands.tolist()]
+
+def criteria_matrix(ratings):
+    # Accepts ORM rows, dicts, or a mapping of criterion name -> column
+    if isinstance(ratings, dict):
+        return np.column_stack([np.asarray(ratings[name], dtype=np.int64) for name in RATING_CRITERIA])
+    rows = [
+        [rating[name] if isinstance(rating, dict) else getattr(rating, name) for name in RATING_CRITERIA]
+        for rating in ratings
+    ]
+    return np.asarray(rows, dtype=np.int64).reshape(len(rows), len(RATING_CRITERIA))
+
+def score_batch(ratings, settings):
+    matrix = criteria_matrix(ratings)
+    totals = matrix.sum(axis=1)
+    bands = classify(totals, settings)
+    return {
+        'total_score': totals,
+        'avg_score': totals / len(RATING_CRITERIA),
+        'band': bands,
+        'band_counts': count_bands(bands)
+    }
+
+def score_rating(values, settings):
+    scores = score_batch([values], settings)
+    return {
+        'total_score': int(scores['total_score'][0]),
+        'avg_score': float(scores['avg_score'][0]),
+        'band': band_names(scores['band'])[0]
+    }
@@ -0,0 +1,14 @@
+from flask_session import Session
+from models import db
+
+def init_session(app):
+    session_type = app.config['SESSION_TYPE']
+    if session_type == 'redis':
+        if not app.config.get('SESSION_REDIS'):
+            import redis
+            app.config['SESSION_REDIS'] = redis.from_url(app.config['SESSION_REDIS_URL'])
+    elif session_type == 'sqlalchemy':
+        app.config['SESSION_SQLALCHEMY'] = db
+    elif session_type != 'filesystem':
+        raise ValueError(f'Unsupported SESSION_TYPE: {session_type}')
+    Session(app)
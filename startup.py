@@ -0,0 +1,28 @@
+import time
+import logging
+
+class StartupTimer:
+    def __init__(self, started=None):
+        self.started = started if started is not None else time.perf_counter()
+        self.last = self.started
+        self.steps = []
+
+    def step(self, name):
+        now = time.perf_counter()
+        self.steps.append((name, now - self.last))
+        self.last = now
+
+    def report(self, app):
+        total = self.last - self.started
+        report = {
+            'total_seconds': round(total, 3),
+            'steps': {name: round(seconds, 3) for name, seconds in self.steps}
+        }
+        app.config['STARTUP_REPORT'] = report
+        budget = app.config.get('STARTUP_BUDGET_SECONDS')
+        summary = ', '.join(f'{name} {seconds * 1000:.0f}ms' for name, seconds in self.steps)
+        if budget and total > budget:
+            logging.warning(f"Startup took {total:.2f}s, over the {budget:.2f}s budget: {summary}")
+        else:
+            logging.info(f"Startup took {total:.2f}s: {summary}")
+        return report
@@ -0,0 +1,100 @@
+import json
+import logging
+from datetime import datetime
+import requests
+import stripe
+from sqlalchemy.exc import IntegrityError
+from models import db, Client, StripeEvent
+from auth0_client import get_auth0_client
+
+PLAN_FEATURES = {
+    'basic_plan_id': {'access_level': 'basic', 'features': ['feature1', 'feature2']},
+    'professional_plan_id': {'access_level': 'professional', 'features': ['feature1', 'feature2', 'feature3']},
+    'enterprise_plan_id': {'access_level': 'enterprise', 'features': ['feature1', 'feature2', 'feature3', 'feature4']},
+}
+
+# Matches the Client.tier values
+PLAN_TIERS = {
+    'basic_plan_id': 1,
+    'professional_plan_id': 2,
+    'enterprise_plan_id': 3,
+}
+
+def determine_features(plan_id):
+    return PLAN_FEATURES.get(plan_id, {})
+
+def handle_checkout_completed(checkout_session):
+    customer_email = checkout_session['customer_details']['email']
+    subscription = stripe.Subscription.retrieve(checkout_session['subscription'])
+    plan_id = subscription['items']['data'][0]['price']['product']
+
+    client = Client.query.filter_by(email=customer_email).first()
+    if client is not None and plan_id in PLAN_TIERS:
+        client.tier = PLAN_TIERS[plan_id]
+
+    auth0_client = get_auth0_client()
+    user_id = auth0_client.resolve_user_id(customer_email)
+    if user_id is not None:
+        auth0_client.update_user_metadata(user_id, determine_features(plan_id))
+
+EVENT_HANDLERS = {
+    'checkout.session.completed': handle_checkout_completed,
+}
+
+def record_stripe_event(event, payload):
+    # Returns False when the event was already processed and can be acknowledged as is
+    db.session.add(StripeEvent(id=event['id'], type=event['type'], payload=payload))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        stored = db.session.get(StripeEvent, event['id'])
+        if stored is None:
+            raise
+        return stored.processed_at is None
+    return True
+
+def process_stripe_event(event_id):
+    # The row lock serialises concurrent deliveries of the same event
+    stored = db.session.get(StripeEvent, event_id, with_for_update=True)
+    if stored is None:
+        logging.warning(f"Stripe event {event_id} not found")
+        return 'missing'
+    if stored.processed_at is not None:
+        db.session.rollback()
+        return 'duplicate'
+
+    event = json.loads(stored.payload)
+    handler = EVENT_HANDLERS.get(stored.type)
+    if handler is not None:
+        handler(event['data']['object'])
+    stored.processed_at = datetime.utcnow()
+    db.session.commit()
+    return 'processed'
+
+def send_rating_reminders(reminders):
+    from flask_mail import Message
+    from mail import mail
+
+    # One SMTP connection for the whole batch instead of one per message
+    with mail.connect() as connection:
+        for reminder in reminders:
+            due = datetime.fromisoformat(reminder['due'])
+            connection.send(Message(
+                subject=f"Rating due for {reminder['team_name']}",
+                recipients=[reminder['recipient']],
+                body=f"The next rating of {reminder['team_name']} is due on {due:%d %B %Y}."
+            ))
+    return len(reminders)
+
+def register_tasks(celery):
+    @celery.task(name='tasks.process_stripe_event', autoretry_for=(stripe.error.StripeError, requests.RequestException),
+                 retry_backoff=True, max_retries=5)
+    def process_stripe_event_task(event_id):
+        return process_stripe_event(event_id)
+
+    @celery.task(name='tasks.send_rating_reminders', autoretry_for=(OSError,), retry_backoff=True, max_retries=3)
+    def send_rating_reminders_task(reminders):
+        return send_rating_reminders(reminders)
+
+    return celery
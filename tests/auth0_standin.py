@@ -0,0 +1,102 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, unquote
+
+# Local stand-in for the parts of the Auth0 Management API the app uses: client-credentials
+# tokens, users-by-email and PATCH /users/<id>. Point AUTH0_API_BASE_URL at it:
+#   python -m tests.auth0_standin --port 8089
+#   AUTH0_API_BASE_URL=http://127.0.0.1:8089 AUTH0_API_TOKEN=test flask ...
+
+class Auth0StandIn:
+    def __init__(self, users=None, host='127.0.0.1', port=0):
+        # email -> Auth0 user id
+        self.users = dict(users or {})
+        self.patches = []
+        self.lookups = []
+        # user id -> HTTP status to answer PATCH with
+        self.failures = {}
+        # user ids answered with a single 429 before they succeed
+        self.rate_limited = set()
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status, body=None, headers=None):
+                data = json.dumps(body if body is not None else {}).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _body(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                return json.loads(self.rfile.read(length) or b'{}')
+
+            def do_POST(self):
+                if urlparse(self.path).path != '/oauth/token':
+                    return self._reply(404)
+                self._body()
+                self._reply(200, {'access_token': 'standin-token', 'expires_in': 86400})
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path != '/api/v2/users-by-email':
+                    return self._reply(404)
+                email = parse_qs(url.query).get('email', [''])[0]
+                with standin.lock:
+                    standin.lookups.append(email)
+                    user_id = standin.users.get(email)
+                self._reply(200, [{'user_id': user_id, 'email': email}] if user_id else [])
+
+            def do_PATCH(self):
+                path = urlparse(self.path).path
+                if not path.startswith('/api/v2/users/'):
+                    return self._reply(404)
+                user_id = unquote(path[len('/api/v2/users/'):])
+                body = self._body()
+                with standin.lock:
+                    if user_id in standin.rate_limited:
+                        standin.rate_limited.discard(user_id)
+                        return self._reply(429, {'error': 'Too Many Requests'},
+                                           {'X-RateLimit-Reset': str(int(time.time()))})
+                    status = standin.failures.get(user_id, 200)
+                    if status == 200:
+                        standin.patches.append((user_id, body))
+                self._reply(status, {'user_id': user_id, **body})
+
+        return Handler
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Run a local Auth0 Management API stand-in')
+    parser.add_argument('--port', type=int, default=8089)
+    args = parser.parse_args()
+    standin = Auth0StandIn(port=args.port)
+    print(f'Auth0 stand-in listening on {standin.url}')
+    standin.server.serve_forever()
@@ -0,0 +1,30 @@
+from flask import Flask
+from config import Config
+from models import db, Client, User, Team, TeamMember, RATING_CRITERIA
+
+def create_test_app(**config):
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config.update(SECRET_KEY='test', SQLALCHEMY_DATABASE_URI='sqlite://', SQLALCHEMY_ENGINE_OPTIONS={},
+                      SQLALCHEMY_BINDS={})
+    app.config.update(config)
+    db.init_app(app)
+    return app
+
+def add_team(name='Team', members=3, client_name='Client'):
+    client = Client(name=client_name, email=f'{client_name.lower()}@example.com')
+    user = User(username=client_name.lower(), email=f'{client_name.lower()}-user@example.com', client=client)
+    team = Team(name=name, client=client, user=user)
+    for index in range(members):
+        db.session.add(TeamMember(first_name=f'First{index}', surname=f'Surname{index}',
+                                  employer_id=f'E{index}', team=team))
+    db.session.add(team)
+    db.session.commit()
+    return team
+
+def login(test_client, user):
+    with test_client.session_transaction() as session:
+        session['user'] = {'email': user.email}
+
+def rating_values(value=5):
+    return dict.fromkeys(RATING_CRITERIA, value)
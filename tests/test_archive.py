@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import insert
+from models import db, Team, Rating, RatingArchive, TeamRatingRollup, Settings
+from archive import archive_ratings, reaches_archive
+from rollups import init_rollups, rollup_gaps
+from notifications import init_notifications, refresh_next_due
+from routes.team_history import team_history_bp
+from tests.conftest import create_test_app, add_team, login, rating_values
+
+NOW = datetime.utcnow()
+DAYS_AGO = (1000, 900, 800, 10, 5)
+
+@pytest.fixture
+def app():
+    app = create_test_app()
+    init_rollups()
+    init_notifications()
+    app.register_blueprint(team_history_bp, url_prefix='/rate_team')
+    with app.app_context():
+        db.create_all(bind_key=None)
+        yield app
+        db.session.remove()
+        db.drop_all(bind_key=None)
+
+@pytest.fixture
+def team(app):
+    team = add_team(members=1)
+    for days in DAYS_AGO:
+        db.session.add(Rating(team_member=team.members[0], timestamp=NOW - timedelta(days=days),
+                              total_score=8 * days % 81, avg_score=days % 81 / 8, **rating_values()))
+    db.session.commit()
+    return team
+
+def weekly_count(team):
+    return sum(rollup.rating_count for rollup in TeamRatingRollup.query.filter_by(team_id=team.id, period='weekly'))
+
+def test_old_ratings_move_to_the_archive(team):
+    assert reaches_archive(None) is False
+
+    assert archive_ratings(730) == 3
+
+    assert Rating.query.count() == 2
+    assert RatingArchive.query.count() == 3
+    assert reaches_archive(NOW - timedelta(days=900))
+    assert not reaches_archive(NOW - timedelta(days=100))
+    assert weekly_count(team) == len(DAYS_AGO)
+
+def test_missing_rollups_are_rebuilt_before_archiving(team):
+    # Written past the ORM, so the rollups never saw it
+    db.session.execute(insert(Rating), [dict(rating_values(), team_member_id=team.members[0].id,
+                                              timestamp=NOW - timedelta(days=1200), total_score=40, avg_score=5.0)])
+    db.session.commit()
+    assert rollup_gaps([team.id]) == [team.id]
+
+    archive_ratings(730)
+
+    assert rollup_gaps([team.id]) == []
+    assert weekly_count(team) == len(DAYS_AGO) + 1
+
+def test_history_pages_across_the_archive(app, team):
+    archive_ratings(730)
+    test_client = app.test_client()
+    login(test_client, team.user)
+
+    seen = []
+    cursor = ''
+    while True:
+        response = test_client.get(f'/rate_team/get_member_history/{team.members[0].id}?limit=2&cursor={cursor}')
+        assert response.status_code == 200
+        seen.append([rating['timestamp'] for rating in response.json['ratings']])
+        cursor = response.json['next_cursor']
+        if cursor is None:
+            break
+
+    expected = [(NOW - timedelta(days=days)).isoformat() for days in sorted(DAYS_AGO)]
+    assert seen == [expected[0:2], expected[2:4], expected[4:]]
+
+def test_offset_timestamps_are_compared_as_utc(app, team):
+    archive_ratings(730)
+    test_client = app.test_client()
+    login(test_client, team.user)
+    start = (NOW - timedelta(days=850)).replace(microsecond=0).isoformat() + '+02:00'
+
+    response = test_client.get(f'/rate_team/get_team_history/{team.id}', query_string={'start': start})
+
+    assert response.status_code == 200
+    assert len(response.json['members'][0]['ratings']) == 3
+
+def test_due_date_survives_archiving_the_whole_history(team):
+    settings = Settings(client_id=team.client_id, frequency_monthly=False, frequency_weekly=True)
+    db.session.add(settings)
+    db.session.commit()
+    archive_ratings(3)
+    assert Rating.query.count() == 0
+
+    refresh_next_due(db.session, team.client_id)
+    db.session.expire_all()
+
+    latest = NOW - timedelta(days=min(DAYS_AGO))
+    assert db.session.get(Team, team.id).next_rating_due == latest + timedelta(weeks=1)
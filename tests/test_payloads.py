@@ -0,0 +1,51 @@
+import json
+from datetime import datetime
+import pytest
+from sqlalchemy import select
+from models import db, Team, Rating, Settings
+from payloads import (
+    RATING_FIELDS, columnar, encode, rating_columns, rating_payloads, settings_columns, settings_payload,
+    team_columns, team_payloads
+)
+from tests.conftest import create_test_app, add_team, rating_values
+
+@pytest.fixture
+def app():
+    app = create_test_app()
+    with app.app_context():
+        db.create_all(bind_key=None)
+        yield app
+        db.session.remove()
+        db.drop_all(bind_key=None)
+
+def test_settings_payload_matches_to_dict(app):
+    team = add_team()
+    settings = Settings(client_id=team.client_id, green_max=None, frequency_weekly=True)
+    db.session.add(settings)
+    db.session.commit()
+    row = db.session.execute(select(*settings_columns(Settings))).one()
+
+    assert json.loads(encode(settings_payload(row))) == settings.to_dict()
+    assert json.loads(encode(settings_payload(settings))) == settings.to_dict()
+
+def test_team_payloads_from_rows(app):
+    team = add_team('Alpha')
+    rows = db.session.execute(select(*team_columns(Team))).all()
+
+    assert json.loads(encode(team_payloads(rows))) == [
+        {'id': team.id, 'name': 'Alpha', 'client_id': team.client_id, 'user_id': team.user_id}
+    ]
+
+def test_rating_rows_and_columns(app):
+    member = add_team(members=1).members[0]
+    timestamp = datetime(2024, 5, 13, 9, 30)
+    db.session.add(Rating(team_member=member, timestamp=timestamp, total_score=40, avg_score=5.0, **rating_values()))
+    db.session.commit()
+    rows = db.session.execute(select(*rating_columns(Rating))).all()
+
+    rating = json.loads(encode(rating_payloads(rows)))[0]
+    assert rating == dict(rating_values(), id=rows[0].id, team_member_id=member.id, timestamp='2024-05-13T09:30:00',
+                          total_score=40, avg_score=5.0, band=None)
+    columns = json.loads(encode(columnar(rows, RATING_FIELDS, band=['white'])))
+    assert columns['total_score'] == [40] and columns['band'] == ['white']
+    assert json.loads(encode(columnar([], RATING_FIELDS)))['id'] == []
@@ -0,0 +1,88 @@
+import pytest
+from models import db, Team, Rating, MemberRatingRollup, TeamRatingRollup
+from rollups import init_rollups
+from notifications import init_notifications
+from routes.rate_team_bulk import rate_team_bulk_bp
+from tests.conftest import create_test_app, add_team, login, rating_values
+
+@pytest.fixture
+def app():
+    app = create_test_app()
+    init_rollups()
+    init_notifications()
+    app.register_blueprint(rate_team_bulk_bp, url_prefix='/rate_team')
+    with app.app_context():
+        db.create_all(bind_key=None)
+        yield app
+        db.session.remove()
+        db.drop_all(bind_key=None)
+
+@pytest.fixture
+def team(app):
+    return add_team(members=3)
+
+@pytest.fixture
+def test_client(app, team):
+    test_client = app.test_client()
+    login(test_client, team.user)
+    return test_client
+
+def submit(test_client, team, body):
+    return test_client.post(f'/rate_team/submit_team_ratings/{team.id}', json=body)
+
+def test_whole_team_is_rated_in_one_request(test_client, team):
+    member_ids = [member.id for member in team.members]
+    entries = [dict(rating_values(value), team_member_id=member_id) for member_id, value in zip(member_ids, (2, 6, 10))]
+
+    response = submit(test_client, team, {'ratings': entries})
+
+    assert response.status_code == 201
+    assert [(rating['total_score'], rating['band']) for rating in response.json['ratings']] == [
+        (16, 'red'), (48, 'orange'), (80, 'green')
+    ]
+    assert response.json['band_counts'] == {'red': 1, 'orange': 1, 'white': 0, 'green': 1}
+    assert Rating.query.count() == 3
+    # Bulk inserts skip the flush hooks, so rollups and the due date are updated by the endpoint
+    assert TeamRatingRollup.query.filter_by(team_id=team.id, period='weekly').one().rating_count == 3
+    assert MemberRatingRollup.query.filter_by(period='monthly').count() == 3
+    assert db.session.get(Team, team.id).next_rating_due is not None
+
+@pytest.mark.parametrize('body', [[{'team_member_id': 1}], 'ratings', 42, None])
+def test_body_must_be_an_object(test_client, team, body):
+    response = submit(test_client, team, body)
+
+    assert response.status_code == 400
+    assert Rating.query.count() == 0
+
+@pytest.mark.parametrize('ratings', [[], {'team_member_id': 1}, None])
+def test_ratings_must_be_a_non_empty_list(test_client, team, ratings):
+    assert submit(test_client, team, {'ratings': ratings}).status_code == 400
+
+def test_invalid_entries_reject_the_whole_payload(test_client, team):
+    first, second, third = [member.id for member in team.members]
+    outsider = add_team('Other', members=1, client_name='Other').members[0].id
+    entries = [
+        dict(rating_values(), team_member_id=first),
+        'not a rating',
+        dict(rating_values(), team_member_id=True),
+        dict(rating_values(), team_member_id=[second]),
+        dict(rating_values(), team_member_id=first),
+        dict(rating_values(), team_member_id=outsider),
+        dict(rating_values(11), team_member_id=third),
+        dict(rating_values(), team_member_id=second, trained='5'),
+    ]
+
+    response = submit(test_client, team, {'ratings': entries})
+
+    assert response.status_code == 400
+    errors = response.json['errors']
+    assert sorted({error['index'] for error in errors}) == [1, 2, 3, 4, 5, 6, 7]
+    assert any('more than once' in error['error'] for error in errors if error['index'] == 4)
+    assert Rating.query.count() == 0
+    assert MemberRatingRollup.query.count() == 0
+
+def test_other_clients_team_is_not_found(app, test_client):
+    other = add_team('Other', client_name='Other')
+    entries = [dict(rating_values(), team_member_id=member.id) for member in other.members]
+
+    assert submit(test_client, other, {'ratings': entries}).status_code == 404
@@ -0,0 +1,93 @@
+import shutil
+import time
+import pytest
+from flask import Blueprint, jsonify
+from models import db, Team, TeamMember, MemberRatingRollup
+from db_routing import STICKY_COOKIE, init_read_replica
+from rollups import init_rollups
+from routes.rate_team_bulk import rate_team_bulk_bp
+from tests.conftest import create_test_app, add_team, login, rating_values
+
+reads_bp = Blueprint('reads', __name__)
+
+@reads_bp.route('/teams')
+def team_names():
+    return jsonify([team.name for team in Team.query.order_by(Team.name)])
+
+@pytest.fixture
+def app(tmp_path):
+    (tmp_path / 'replica').mkdir()
+    app = create_test_app(
+        SQLALCHEMY_DATABASE_URI=f'sqlite:///{tmp_path}/primary.db',
+        SQLALCHEMY_BINDS={'replica': f'sqlite:///{tmp_path}/replica/replica.db'},
+        SESSION_TYPE='filesystem',
+        REPLICA_READ_BLUEPRINTS=[],
+        REPLICA_STICKY_SECONDS=5,
+        REPLICA_HEALTH_TTL=30
+    )
+    init_read_replica(app, db)
+    init_rollups()
+    app.register_blueprint(reads_bp)
+    app.register_blueprint(rate_team_bulk_bp, url_prefix='/rate_team')
+    with app.app_context():
+        # Schema creation only touches the primary, so the replica does not have to exist at boot
+        db.create_all(bind_key=None)
+        client_id = add_team('Replicated').client_id
+        db.session.remove()
+        db.engine.dispose()
+        # The replica is a copy of the primary; later writes only reach the primary
+        shutil.copy(tmp_path / 'primary.db', tmp_path / 'replica' / 'replica.db')
+        db.session.add(Team(name='Primary only', client_id=client_id))
+        db.session.commit()
+    # Each request gets its own app context, and with it a fresh g and session
+    return app
+
+def make_replica_unreachable(app, tmp_path):
+    with app.app_context():
+        db.engines['replica'].dispose()
+    shutil.rmtree(tmp_path / 'replica')
+
+def test_reads_go_to_the_replica(app):
+    assert app.test_client().get('/teams').json == ['Replicated']
+
+def test_writes_go_to_the_primary_and_stick(app):
+    test_client = app.test_client()
+    with app.app_context():
+        team = Team.query.filter_by(name='Replicated').one()
+        team_id = team.id
+        member_ids = [member.id for member in team.members]
+        login(test_client, team.user)
+
+    response = test_client.post(f'/rate_team/submit_team_ratings/{team_id}', json={
+        'ratings': [dict(rating_values(), team_member_id=member_id) for member_id in member_ids]
+    })
+
+    # Rollups resolve their bind from a model class, not a mapper
+    assert response.status_code == 201
+    with app.app_context():
+        assert MemberRatingRollup.query.filter_by(period='weekly').count() == len(member_ids)
+    sticky = test_client.get_cookie(STICKY_COOKIE)
+    assert float(sticky.value) > time.time()
+    # Read-your-writes: the writing client reads the primary until the cookie expires
+    assert test_client.get('/teams').json == ['Primary only', 'Replicated']
+    test_client.delete_cookie(STICKY_COOKIE)
+    assert test_client.get('/teams').json == ['Replicated']
+
+def test_unreachable_replica_falls_back_to_primary(app, tmp_path):
+    test_client = app.test_client()
+    assert test_client.get('/teams').json == ['Replicated']
+    make_replica_unreachable(app, tmp_path)
+
+    response = test_client.get('/teams')
+
+    assert response.status_code == 200
+    assert response.json == ['Primary only', 'Replicated']
+    router = app.extensions['read_replica']
+    assert not router.available()
+    # While marked down the replica is not tried at all
+    assert test_client.get('/teams').json == ['Primary only', 'Replicated']
+
+def test_get_bind_accepts_a_model_class(app):
+    with app.test_request_context('/teams'):
+        assert db.session.get_bind(mapper=TeamMember) is app.extensions['read_replica'].engine
+        assert db.session.get_bind(mapper=MemberRatingRollup) is app.extensions['read_replica'].engine
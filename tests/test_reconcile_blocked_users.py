@@ -0,0 +1,99 @@
+import pytest
+from flask import Flask
+from models import db, Client, User
+from auth0_client import Auth0Client
+from scheduler import reconcile_blocked_users
+from tests.auth0_standin import Auth0StandIn
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all(bind_key=None)
+        yield app
+        db.session.remove()
+        db.drop_all(bind_key=None)
+
+@pytest.fixture
+def standin():
+    standin = Auth0StandIn(users={'lookup@example.com': 'auth0|lookup'}).start()
+    yield standin
+    standin.stop()
+
+@pytest.fixture
+def auth0(standin):
+    return Auth0Client('standin.test', static_token='test', base_url=standin.url, requests_per_second=1000)
+
+def add_user(client, name, auth0_blocked, auth0_id=True):
+    user = User(username=name, email=f'{name}@example.com', client=client, auth0_blocked=auth0_blocked,
+                auth0_id=f'auth0|{name}' if auth0_id else None)
+    db.session.add(user)
+    return user
+
+def blocked_states():
+    return {user.username: user.auth0_blocked for user in User.query.order_by(User.username)}
+
+def test_only_changed_users_are_patched(app, standin, auth0):
+    active = Client(name='Active', email='active@example.com', payment_status='active')
+    blocked = Client(name='Blocked', email='blocked@example.com', payment_status='blocked')
+    add_user(blocked, 'newly_blocked', None)
+    add_user(blocked, 'still_blocked', True)
+    add_user(active, 'unblocked', True)
+    add_user(active, 'still_active', False)
+    add_user(blocked, 'lookup', None, auth0_id=False)
+    db.session.commit()
+
+    report = reconcile_blocked_users(auth0, max_workers=4)
+
+    assert sorted(standin.patches) == [
+        ('auth0|lookup', {'blocked': True}),
+        ('auth0|newly_blocked', {'blocked': True}),
+        ('auth0|unblocked', {'blocked': False}),
+    ]
+    # Users with a stored auth0_id are never looked up by email
+    assert standin.lookups == ['lookup@example.com']
+    assert report == {'processed': 5, 'skipped': 2, 'blocked': 2, 'unblocked': 1, 'failed': 0}
+    assert blocked_states() == {
+        'lookup': True, 'newly_blocked': True, 'still_active': False, 'still_blocked': True, 'unblocked': False
+    }
+    assert User.query.filter_by(username='lookup').one().auth0_id == 'auth0|lookup'
+
+def test_failed_pushes_are_not_recorded(app, standin, auth0):
+    blocked = Client(name='Blocked', email='blocked@example.com', payment_status='blocked')
+    add_user(blocked, 'fails', None)
+    add_user(blocked, 'unknown', None, auth0_id=False)
+    add_user(blocked, 'works', None)
+    db.session.commit()
+    standin.failures['auth0|fails'] = 500
+
+    report = reconcile_blocked_users(auth0)
+
+    assert standin.patches == [('auth0|works', {'blocked': True})]
+    assert report['failed'] == 2
+    # Left as they were, so the next run retries them
+    assert blocked_states() == {'fails': None, 'unknown': None, 'works': True}
+
+def test_rate_limited_push_is_retried(app, standin, auth0):
+    blocked = Client(name='Blocked', email='blocked@example.com', payment_status='blocked')
+    add_user(blocked, 'limited', None)
+    db.session.commit()
+    standin.rate_limited.add('auth0|limited')
+
+    report = reconcile_blocked_users(auth0)
+
+    assert standin.patches == [('auth0|limited', {'blocked': True})]
+    assert report['blocked'] == 1 and report['failed'] == 0
+    assert blocked_states() == {'limited': True}
+
+def test_second_run_is_a_no_op(app, standin, auth0):
+    blocked = Client(name='Blocked', email='blocked@example.com', payment_status='blocked')
+    add_user(blocked, 'user', None)
+    db.session.commit()
+
+    reconcile_blocked_users(auth0)
+    report = reconcile_blocked_users(auth0)
+
+    assert len(standin.patches) == 1
+    assert report == {'processed': 1, 'skipped': 1, 'blocked': 0, 'unblocked': 0, 'failed': 0}
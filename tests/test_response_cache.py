@@ -0,0 +1,95 @@
+import pytest
+from flask import jsonify
+import response_cache
+from models import db, Team, Rating
+from response_cache import cached_response, init_response_cache, team_analytics_resource
+from tests.conftest import create_test_app, add_team, login, rating_values
+
+def make_app(**config):
+    app = create_test_app(WEB_CONCURRENCY=1, **config)
+
+    @app.route('/teams')
+    @cached_response('teams')
+    def team_names():
+        return jsonify([team.name for team in Team.query.order_by(Team.name)])
+
+    init_response_cache(app)
+    with app.app_context():
+        db.create_all(bind_key=None)
+        team = add_team()
+        team_id, client_id, user = team.id, team.client_id, team.user
+        test_client = app.test_client()
+        login(test_client, user)
+    return app, test_client, team_id, client_id
+
+@pytest.fixture(autouse=True)
+def reset_cache():
+    yield
+    response_cache.cache = None
+
+def rename_team(app, team_id, name):
+    with app.app_context():
+        db.session.get(Team, team_id).name = name
+        db.session.commit()
+
+def test_unchanged_resource_revalidates_with_304():
+    app, test_client, team_id, client_id = make_app(RESPONSE_CACHE_TYPE='simple')
+
+    first = test_client.get('/teams')
+    second = test_client.get('/teams', headers={'If-None-Match': first.headers['ETag']})
+
+    assert first.status_code == 200 and first.json == ['Team']
+    assert first.headers['Cache-Control'] == 'private, no-cache'
+    assert second.status_code == 304
+    assert second.headers['ETag'] == first.headers['ETag']
+
+def test_committed_write_invalidates():
+    app, test_client, team_id, client_id = make_app(RESPONSE_CACHE_TYPE='simple')
+    etag = test_client.get('/teams').headers['ETag']
+
+    rename_team(app, team_id, 'Renamed')
+    response = test_client.get('/teams', headers={'If-None-Match': etag})
+
+    assert response.status_code == 200
+    assert response.json == ['Renamed']
+    assert response.headers['ETag'] != etag
+
+def test_rolled_back_write_keeps_the_cache():
+    app, test_client, team_id, client_id = make_app(RESPONSE_CACHE_TYPE='simple')
+    etag = test_client.get('/teams').headers['ETag']
+
+    with app.app_context():
+        db.session.get(Team, team_id).name = 'Never saved'
+        db.session.flush()
+        db.session.rollback()
+
+    assert test_client.get('/teams', headers={'If-None-Match': etag}).status_code == 304
+
+def test_new_rating_invalidates_team_analytics():
+    app, test_client, team_id, client_id = make_app(RESPONSE_CACHE_TYPE='simple')
+    resource = team_analytics_resource(team_id)
+    before = response_cache.cache.generation(client_id, resource)
+    teams_before = response_cache.cache.generation(client_id, 'teams')
+
+    with app.app_context():
+        member = db.session.get(Team, team_id).members[0]
+        db.session.add(Rating(team_member=member, total_score=40, avg_score=5.0, **rating_values()))
+        db.session.commit()
+
+    assert response_cache.cache.generation(client_id, resource) == before + 1
+    # Other resources of the client keep their cached entries
+    assert response_cache.cache.generation(client_id, 'teams') == teams_before
+
+def test_unreachable_redis_serves_uncached():
+    app, test_client, team_id, client_id = make_app(
+        RESPONSE_CACHE_TYPE='redis', RESPONSE_CACHE_REDIS_URL='redis://127.0.0.1:1/0', RESPONSE_CACHE_REDIS_TIMEOUT=0.1
+    )
+
+    response = test_client.get('/teams')
+
+    assert response.status_code == 200
+    assert response.json == ['Team']
+    assert 'ETag' not in response.headers
+    # The commit succeeds even though its invalidation cannot reach the cache
+    rename_team(app, team_id, 'Renamed')
+    assert test_client.get('/teams').json == ['Renamed']
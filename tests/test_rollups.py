@@ -0,0 +1,95 @@
+from datetime import datetime
+import pytest
+from sqlalchemy import insert
+from models import db, Rating, MemberRatingRollup, TeamRatingRollup
+from rollups import init_rollups, period_start, rebuild_rollups, rollup_gaps, get_team_rollups, get_member_rollups
+from tests.conftest import create_test_app, add_team, rating_values
+
+@pytest.fixture
+def app():
+    app = create_test_app()
+    init_rollups()
+    with app.app_context():
+        db.create_all(bind_key=None)
+        yield app
+        db.session.remove()
+        db.drop_all(bind_key=None)
+
+@pytest.fixture
+def team(app):
+    return add_team(members=2)
+
+def add_rating(member, timestamp, value):
+    db.session.add(Rating(team_member=member, timestamp=timestamp, total_score=8 * value, avg_score=float(value),
+                          **rating_values(value)))
+
+def rollup_rows(model):
+    return sorted(
+        (row.period, row.period_start, row.rating_count, row.sum_total_score, row.sum_trained)
+        for row in model.query.all()
+    )
+
+@pytest.mark.parametrize('period, expected', [
+    ('weekly', datetime(2024, 5, 13)),
+    ('bi_weekly', datetime(2024, 5, 13)),
+    ('monthly', datetime(2024, 5, 1)),
+    ('quarterly', datetime(2024, 4, 1)),
+])
+def test_period_start(period, expected):
+    assert period_start(datetime(2024, 5, 15, 17, 30), period) == expected
+
+def test_fortnights_are_shared_by_every_team():
+    assert period_start(datetime(2024, 5, 26), 'bi_weekly') == datetime(2024, 5, 13)
+    assert period_start(datetime(2024, 5, 27), 'bi_weekly') == datetime(2024, 5, 27)
+
+def test_saved_ratings_are_rolled_up(team):
+    first, second = team.members
+    add_rating(first, datetime(2024, 5, 13), 4)
+    add_rating(second, datetime(2024, 5, 14), 6)
+    db.session.commit()
+    # A later flush increments the existing buckets
+    add_rating(first, datetime(2024, 5, 31), 10)
+    db.session.commit()
+
+    assert get_team_rollups(team.id, 'monthly') == [{
+        'period': 'monthly', 'period_start': '2024-05-01T00:00:00', 'rating_count': 3,
+        'avg_total_score': 53 + 1 / 3, 'avg_score': 6 + 2 / 3, **rating_values(6 + 2 / 3)
+    }]
+    members = get_member_rollups(team.id, 'weekly')
+    assert [rollup['rating_count'] for rollup in members[first.id]] == [1, 1]
+    assert [rollup['avg_total_score'] for rollup in members[second.id]] == [48]
+    assert rollup_gaps([team.id]) == []
+
+def test_rolled_back_ratings_leave_no_rollups(team):
+    add_rating(team.members[0], datetime(2024, 5, 13), 4)
+    db.session.flush()
+    db.session.rollback()
+
+    assert TeamRatingRollup.query.count() == 0
+
+def test_rebuild_matches_incremental_rollups(team):
+    for index, timestamp, value in ((0, datetime(2024, 1, 1), 2), (1, datetime(2024, 1, 9), 5),
+                                    (0, datetime(2024, 1, 20), 7), (1, datetime(2024, 2, 14), 9)):
+        add_rating(team.members[index], timestamp, value)
+    db.session.commit()
+    incremental = rollup_rows(MemberRatingRollup), rollup_rows(TeamRatingRollup)
+
+    rebuild_rollups()
+
+    assert (rollup_rows(MemberRatingRollup), rollup_rows(TeamRatingRollup)) == incremental
+
+def test_rebuild_fills_gaps(team):
+    other = add_team('Other', client_name='Other')
+    add_rating(other.members[0], datetime(2024, 5, 13), 4)
+    db.session.commit()
+    # Written past the ORM, so the rollups never saw it
+    db.session.execute(insert(Rating), [dict(rating_values(5), team_member_id=team.members[0].id,
+                                              timestamp=datetime(2024, 5, 14), total_score=40, avg_score=5.0)])
+    db.session.commit()
+
+    assert rollup_gaps([team.id, other.id]) == [team.id]
+    rebuild_rollups(team_ids=[team.id])
+
+    assert rollup_gaps([team.id, other.id]) == []
+    assert get_team_rollups(team.id, 'weekly')[0]['rating_count'] == 1
+    assert get_team_rollups(other.id, 'weekly')[0]['rating_count'] == 1
@@ -0,0 +1,38 @@
+from models import Settings
+from scoring import MAX_TOTAL, band_names, classify, compile_bands, score_batch, score_rating
+from tests.conftest import rating_values
+
+def test_default_bands():
+    totals = [-1, 0, 40, 41, 55, 56, 70, 71, 80, 81]
+
+    assert band_names(classify(totals, None)) == [
+        None, 'red', 'red', 'orange', 'orange', 'white', 'white', 'green', 'green', None
+    ]
+
+def test_lookup_is_bounded_by_the_highest_total():
+    settings = Settings(green_max=10 ** 9)
+
+    lookup = compile_bands(settings)
+
+    assert lookup.size == MAX_TOTAL + 1
+    assert band_names(classify([80], settings)) == ['green']
+
+def test_unset_thresholds_use_column_defaults():
+    settings = Settings(red_min=None, red_max=None, orange_min=41, orange_max=None, white_min=None,
+                        white_max=70, green_min=None, green_max=None)
+
+    assert band_names(classify([0, 40, 55, 56, 80], settings)) == ['red', 'red', 'orange', 'white', 'green']
+
+def test_first_band_wins_where_ranges_overlap():
+    settings = Settings(red_min=0, red_max=50, orange_min=40, orange_max=60, white_min=-10, white_max=-5,
+                        green_min=61, green_max=80)
+
+    assert band_names(classify([45, 55, 61], settings)) == ['red', 'orange', 'green']
+
+def test_score_batch():
+    scores = score_batch([rating_values(1), rating_values(6), rating_values(10)], None)
+
+    assert scores['total_score'].tolist() == [8, 48, 80]
+    assert scores['avg_score'].tolist() == [1.0, 6.0, 10.0]
+    assert scores['band_counts'] == {'red': 1, 'orange': 1, 'white': 0, 'green': 1}
+    assert score_rating(rating_values(9), None) == {'total_score': 72, 'avg_score': 9.0, 'band': 'green'}
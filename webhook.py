@@ -1,56 +1,93 @@
+import time
+IMPORT_STARTED = time.perf_counter()
+
 import os
 import secrets
 from dotenv import load_dotenv
 from flask import Flask, render_template, redirect, url_for, session, jsonify, request, abort
-from flask_session import Session
 from config import Config
 from models import db
+from sessions import init_session
+from db_routing import init_read_replica
+from rollups import init_rollups
+from notifications import init_notifications
+from mail import mail
+from commands import register_commands
+from instrumentation import init_instrumentation
+from assets import init_assets
+from response_cache import init_response_cache
+from oidc_metadata import OIDCMetadataCache
+from startup import StartupTimer
 from flask_migrate import Migrate
 from authlib.integrations.flask_client import OAuth
 import logging
-import stripe
-import requests
-import json
 
 load_dotenv()  # Load environment variables from .env file
 
-stripe.api_key = os.getenv('STRIPE_SECRET_KEY')
-
 def create_app():
+    timer = StartupTimer(IMPORT_STARTED)
+    timer.step('imports')
+
     app = Flask(__name__)
     app.config.from_object(Config)
     app.secret_key = app.config['SECRET_KEY']
     app.config['STRIPE_PUBLISHABLE_KEY'] = os.getenv('STRIPE_PUBLISHABLE_KEY')
 
-    # Configure session to use the filesystem
-    app.config['SESSION_TYPE'] = 'filesystem'
-    app.config['SESSION_FILE_DIR'] = './.flask_session/'  # Ensure this directory exists and is writable
-    app.config['SESSION_PERMANENT'] = False
-    app.config['SESSION_USE_SIGNER'] = True
-    
-    Session(app)
+    logging.basicConfig(level=app.config['LOG_LEVEL'])
 
     db.init_app(app)
+    init_read_replica(app, db)
+    # Session backend is selected by Config.SESSION_TYPE
+    init_session(app)
     migrate = Migrate(app, db)
-    oauth = OAuth(app)
+    timer.step('extensions')
 
-    auth0 = oauth.register(
-        'auth0',
-        client_id=app.config['AUTH0_CLIENT_ID'],
-        client_secret=app.config['AUTH0_CLIENT_SECRET'],
-        api_base_url=f"https://{app.config['AUTH0_DOMAIN']}",
-        access_token_url=f"https://{app.config['AUTH0_DOMAIN']}/oauth/token",
-        authorize_url=f"https://{app.config['AUTH0_DOMAIN']}/authorize",
-        server_metadata_url=f"https://{app.config['AUTH0_DOMAIN']}/.well-known/openid-configuration",
-        client_kwargs={
+    oauth = OAuth(app)
+    auth0_domain = app.config['AUTH0_DOMAIN']
+    auth0_kwargs = {
+        'client_id': app.config['AUTH0_CLIENT_ID'],
+        'client_secret': app.config['AUTH0_CLIENT_SECRET'],
+        'api_base_url': f"https://{auth0_domain}",
+        'access_token_url': f"https://{auth0_domain}/oauth/token",
+        'authorize_url': f"https://{auth0_domain}/authorize",
+        'client_kwargs': {
             'scope': 'openid profile email',
         },
-    )
-
-    logging.basicConfig(level=logging.DEBUG)
-
-    with app.app_context():
-        db.create_all()
+    }
+    oidc_cache = None
+    oidc_metadata = None
+    if app.config['OIDC_METADATA_CACHE']:
+        oidc_cache = OIDCMetadataCache(auth0_domain, app.config['OIDC_METADATA_CACHE'],
+                                       app.config['OIDC_METADATA_MAX_AGE'])
+        oidc_metadata = oidc_cache.load()
+    if oidc_metadata:
+        auth0_kwargs.update(oidc_metadata)
+    else:
+        auth0_kwargs['server_metadata_url'] = f"https://{auth0_domain}/.well-known/openid-configuration"
+    auth0 = oauth.register('auth0', **auth0_kwargs)
+
+    if oidc_cache is not None:
+        # Re-read the cache when it changes, so refreshed metadata reaches long-running workers
+        @app.before_request
+        def refresh_oidc_metadata():
+            if request.endpoint in ('login', 'callback_handling'):
+                oidc_cache.apply(auth0)
+    timer.step('oauth')
+
+    # Production schemas are managed by migrations (flask db upgrade, run in the release phase)
+    if app.config['AUTO_CREATE_SCHEMA']:
+        # Only the primary: the read replica is optional and may be unreachable or read-only
+        with app.app_context():
+            db.create_all(bind_key=None)
+        timer.step('create_all')
+
+    init_rollups()
+    init_notifications()
+    mail.init_app(app)
+    register_commands(app)
+    init_instrumentation(app)
+    init_assets(app)
+    timer.step('hooks')
 
     from routes.main import main_bp
     from routes.rate_team import rate_team_bp
@@ -61,6 +98,10 @@ def create_app():
     from routes.landing_page import landing_page_bp
     from routes.pricing import pricing_bp
     from routes.payment import payment_bp
+    from routes.team_history import team_history_bp
+    from routes.export import export_bp
+    from routes.rate_team_bulk import rate_team_bulk_bp
+    from routes.team_analytics import team_analytics_bp
     
     app.register_blueprint(main_bp)
     app.register_blueprint(rate_team_bp, url_prefix='/rate_team')
@@ -71,6 +112,12 @@ def create_app():
     app.register_blueprint(landing_page_bp, url_prefix='/dashboard')
     app.register_blueprint(pricing_bp, url_prefix='/pricing')
     app.register_blueprint(payment_bp)
+    app.register_blueprint(team_history_bp, url_prefix='/rate_team')
+    app.register_blueprint(export_bp, url_prefix='/export')
+    app.register_blueprint(rate_team_bulk_bp, url_prefix='/rate_team')
+    app.register_blueprint(team_analytics_bp, url_prefix='/rate_team')
+    init_response_cache(app)
+    timer.step('blueprints')
 
     @app.route('/login')
     def login():
@@ -98,6 +145,7 @@ def create_app():
             token_response = auth0.authorize_access_token()
             response = auth0.get('userinfo')
             session['user'] = response.json()
+            session.pop('client_id', None)
             session.pop('auth0_state', None)
         except Exception as e:
             app.logger.error(f"Error during Auth0 callback: {str(e)}")
@@ -142,6 +190,12 @@ def create_app():
 
     @app.route('/stripe-webhook', methods=['POST'])
     def stripe_webhook():
+        # Stripe, Celery and the task module are only imported once a webhook arrives
+        import stripe
+        from celery_app import get_celery
+        from tasks import record_stripe_event
+        stripe.api_key = os.getenv('STRIPE_SECRET_KEY')
+
         payload = request.get_data(as_text=True)
         sig_header = request.headers.get('Stripe-Signature')
         endpoint_secret = os.getenv('STRIPE_WEBHOOK_SECRET')
@@ -159,46 +213,13 @@ def create_app():
             # Invalid signature
             return jsonify({'error': str(e)}), 400
 
-        # Handle the event
-        if event['type'] == 'checkout.session.completed':
-            session = event['data']['object']
-            customer_email = session['customer_details']['email']
-            subscription_id = session['subscription']
-
-            # Retrieve subscription details
-            subscription = stripe.Subscription.retrieve(subscription_id)
-
-            # Determine the plan and features
-            plan_id = subscription['items']['data'][0]['price']['product']
-            features = determine_features(plan_id)
-
-            # Update Auth0 profile
-            update_auth0_profile(customer_email, features)
+        # Processing runs on Celery; a redelivered event that was already handled is just acknowledged
+        if record_stripe_event(event, payload):
+            get_celery(app).send_task('tasks.process_stripe_event', args=[event['id']])
 
         return jsonify({'status': 'success'}), 200
 
-    def determine_features(plan_id):
-        if plan_id == 'basic_plan_id':
-            return {'access_level': 'basic', 'features': ['feature1', 'feature2']}
-        elif plan_id == 'professional_plan_id':
-            return {'access_level': 'professional', 'features': ['feature1', 'feature2', 'feature3']}
-        elif plan_id == 'enterprise_plan_id':
-            return {'access_level': 'enterprise', 'features': ['feature1', 'feature2', 'feature3', 'feature4']}
-        return {}
-
-    def update_auth0_profile(email, features):
-        url = f'https://{app.config["AUTH0_DOMAIN"]}/api/v2/users-by-email?email={email}'
-        headers = {
-            'Authorization': f'Bearer {os.getenv("AUTH0_API_TOKEN")}',
-            'Content-Type': 'application/json'
-        }
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            user_id = response.json()[0]['user_id']
-            update_url = f'https://{app.config["AUTH0_DOMAIN"]}/api/v2/users/{user_id}'
-            data = {'user_metadata': features}
-            requests.patch(update_url, headers=headers, data=json.dumps(data))
-
+    timer.report(app)
     return app
 
 if __name__ == '__main__':
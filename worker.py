@@ -0,0 +1,10 @@
+import stripe
+import os
+from webhook import create_app
+from celery_app import get_celery
+from tasks import register_tasks
+
+# Start with: celery -A worker.celery worker
+stripe.api_key = os.getenv('STRIPE_SECRET_KEY')
+app = create_app()
+celery = register_tasks(get_celery(app))